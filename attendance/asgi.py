@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'attendance.settings')
+# Django runs the sync code of each ASGI request on a thread of its own and
+# connections belong to a thread, one kept open would never be reused, so
+# the conn_max_age of the settings only applies to the WSGI default. Under
+# ASGI connections are reused by the pooler alone, run it behind PgBouncer
+# with DATABASE_POOLER=pgbouncer.
+os.environ.setdefault('DATABASE_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
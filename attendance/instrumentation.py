@@ -0,0 +1,299 @@
+"""
+Per request timing and SQL instrumentation
+
+InstrumentationMiddleware samples requests and records, per URL name, the
+wall time, the time spent in the database, the python time of the view
+(where the serializers run), the render time, the number of queries and
+the queries that ran more than once. The figures are kept in memory per
+worker process and served as JSON or in the Prometheus text format.
+
+Every worker, a gunicorn worker or a uvicorn process, keeps its own figures
+and a scrape is answered by whichever worker takes it, so every series has
+a worker label with the process id. Sum by view across the workers in the
+queries, a restarted worker starts new series from zero.
+
+A streaming body is measured until it is consumed or closed. Queries are
+recorded on the connections of the thread that runs the middleware, so the
+queries an async view or an async streaming body makes through
+sync_to_async in another thread are not counted, their time is only part
+of the wall and view times.
+"""
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES = (1, 2, 5, 10, 20, 50, 100, 250)
+TOP_DUPLICATES = 20
+
+
+def fingerprint(sql: str) -> str:
+    """
+    The shape of a query, without its literals and with IN lists collapsed
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+\b", "?", sql)
+    sql = re.sub(r"\((?:\s*(?:%s|\?)\s*,?)+\)", "(...)", sql)
+    return re.sub(r"\s+", " ", sql).strip()[:300]
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "buckets": dict(zip(map(str, self.buckets), self.counts)),
+        }
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.wall = Histogram(SECONDS)
+        self.db = Histogram(SECONDS)
+        self.view = Histogram(SECONDS)
+        self.render = Histogram(SECONDS)
+        self.queries = Histogram(QUERIES)
+        self.duplicates = Counter()
+
+    def as_dict(self) -> dict:
+        return {
+            "wall_seconds": self.wall.as_dict(),
+            "db_seconds": self.db.as_dict(),
+            "view_seconds": self.view.as_dict(),
+            "render_seconds": self.render.as_dict(),
+            "queries": self.queries.as_dict(),
+            "duplicate_queries": dict(self.duplicates.most_common(TOP_DUPLICATES)),
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, name, wall, db, view, render, queries, duplicates):
+        with self.lock:
+            endpoint = self.endpoints.setdefault(name, EndpointMetrics())
+            endpoint.wall.observe(wall)
+            endpoint.db.observe(db)
+            endpoint.view.observe(view)
+            endpoint.render.observe(render)
+            endpoint.queries.observe(queries)
+            endpoint.duplicates.update(duplicates)
+            if len(endpoint.duplicates) > TOP_DUPLICATES * 5:
+                endpoint.duplicates = Counter(
+                    dict(endpoint.duplicates.most_common(TOP_DUPLICATES))
+                )
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            return {name: metrics.as_dict() for name, metrics in self.endpoints.items()}
+
+    def prometheus(self) -> str:
+        worker = os.getpid()
+        histograms = {
+            "http_request_duration_seconds": "wall",
+            "http_request_db_seconds": "db",
+            "http_request_view_seconds": "view",
+            "http_request_render_seconds": "render",
+            "http_request_queries": "queries",
+        }
+        lines = []
+        with self.lock:
+            for metric, attribute in histograms.items():
+                lines.append(f"# TYPE {metric} histogram")
+                for name, endpoint in sorted(self.endpoints.items()):
+                    histogram = getattr(endpoint, attribute)
+                    labels = f'view="{name}",worker="{worker}"'
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(
+                            f'{metric}_bucket{{{labels},le="{bound}"}} {count}'
+                        )
+                    lines.append(
+                        f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}'
+                    )
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+            lines.append("# TYPE http_request_duplicate_queries_total counter")
+            for name, endpoint in sorted(self.endpoints.items()):
+                lines.append(
+                    "http_request_duplicate_queries_total"
+                    f'{{view="{name}",worker="{worker}"}} '
+                    f"{sum(endpoint.duplicates.values())}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.time = 0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.time += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+
+class Measurement:
+    """
+    One sampled request, queries are recorded while the view runs and while
+    a streaming body is produced
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.recorder = QueryRecorder()
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def queries(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self.recorder))
+            yield
+
+    def finish(self, response):
+        if not response.streaming:
+            self.record()
+        elif response.is_async:
+            response.streaming_content = self.astream(response.streaming_content)
+        else:
+            response.streaming_content = self.stream(response.streaming_content)
+        return response
+
+    def stream(self, content):
+        try:
+            with self.queries():
+                yield from content
+        finally:
+            self.record()
+
+    async def astream(self, content):
+        try:
+            with self.queries():
+                async for part in content:
+                    yield part
+        finally:
+            self.record()
+
+    def record(self):
+        end = time.perf_counter()
+        request, recorder = self.request, self.recorder
+        view_start = getattr(request, "_instrumentation_view", self.start)
+        render_start = getattr(request, "_instrumentation_render", end)
+        match = request.resolver_match
+        metrics.record(
+            name=match.url_name or match.view_name if match else "unmatched",
+            wall=end - self.start,
+            db=recorder.time,
+            view=max(render_start - view_start - recorder.time, 0),
+            render=end - render_start,
+            queries=recorder.count,
+            duplicates={
+                sql: count - 1
+                for sql, count in recorder.fingerprints.items()
+                if count > 1
+            },
+        )
+
+
+class InstrumentationMiddleware:
+    """
+    Records a sample of the requests, INSTRUMENTATION_SAMPLE_RATE is the
+    share of requests that are measured. It is async capable, but WhiteNoise
+    and corsheaders are not, so under ASGI Django still runs the chain in a
+    thread and every request, async views included, holds one throughout.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "INSTRUMENTATION_SAMPLE_RATE", 1.0)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        measurement = Measurement(request)
+        with measurement.queries():
+            response = self.get_response(request)
+        return measurement.finish(response)
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+        measurement = Measurement(request)
+        with measurement.queries():
+            response = await self.get_response(request)
+        return measurement.finish(response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._instrumentation_view = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook
+        request._instrumentation_render = time.perf_counter()
+        return response
+
+
+class MetricsView(APIView):
+    """
+    Request metrics of this worker process as JSON
+    """
+
+    permission_classes = [
+        IsAdminUser,
+    ]
+
+    def get(self, request):
+        return Response({"worker": os.getpid(), "views": metrics.as_dict()})
+
+
+class PrometheusMetricsView(MetricsView):
+    """
+    Request metrics of this worker process in the Prometheus text format
+    """
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.prometheus(), content_type="text/plain; version=0.0.4"
+        )
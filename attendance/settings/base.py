@@ -62,6 +62,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "attendance.instrumentation.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -73,6 +74,11 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# share of the requests measured by the instrumentation middleware
+INSTRUMENTATION_SAMPLE_RATE = config(
+    "INSTRUMENTATION_SAMPLE_RATE", default=1.0, cast=float
+)
+
 CORS_ORIGIN_WHITELIST = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -123,8 +129,38 @@ WSGI_APPLICATION = "attendance.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
-db_config = dj_database_url.config(default=config("DATABASE_URL"))
-DATABASES = {"default": db_config}
+
+
+def database(conn_max_age: int = 0) -> dict:
+    """
+    The databases from DATABASE_URL, a connection is kept open for
+    DATABASE_CONN_MAX_AGE seconds and checked before it is reused
+    With DATABASE_POOLER=pgbouncer the connections go through PgBouncer in
+    transaction pooling, where a cursor can not outlive its transaction, so
+    server side cursors are turned off. Under ASGI the connections are not
+    kept at all, see asgi.py.
+    """
+    db_config = dj_database_url.config(
+        default=config("DATABASE_URL"),
+        conn_max_age=config("DATABASE_CONN_MAX_AGE", default=conn_max_age, cast=int),
+    )
+    db_config["CONN_HEALTH_CHECKS"] = db_config["CONN_MAX_AGE"] != 0
+    if config("DATABASE_POOLER", default="") == "pgbouncer":
+        db_config["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return {"default": db_config}
+
+
+DATABASES = database()
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
 
 
 # Password validation
@@ -172,7 +208,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.TokenUserAuthentication",
     ],
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
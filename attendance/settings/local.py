@@ -1,4 +1,4 @@
-from attendance.settings.base import ALLOWED_HOSTS
+from attendance.settings.base import ALLOWED_HOSTS, database
 
 ALLOWED_HOSTS += [
     "http://localhost:3000",
@@ -9,3 +9,7 @@ ALLOWED_HOSTS += [
 ]
 
 DEBUG = True
+
+# the development server starts a thread per request, a connection could
+# not be reused anyway
+DATABASES = database(conn_max_age=0)
@@ -1,4 +1,7 @@
-from attendance.settings.base import ALLOWED_HOSTS
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
+from attendance.settings.base import ALLOWED_HOSTS, database
 
 ALLOWED_HOSTS = [
     "http://localhost:3000",
@@ -9,3 +12,23 @@ ALLOWED_HOSTS = [
 ]
 
 DEBUG = True
+
+DATABASES = database(conn_max_age=600)
+
+REDIS_URL = config("REDIS_URL", default="")
+
+# the token blacklist, user state and roster caches are only correct when
+# every worker process reads the same cache
+if not REDIS_URL:
+    raise ImproperlyConfigured("REDIS_URL must be set to the shared cache.")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+}
+
+INSTRUMENTATION_SAMPLE_RATE = config(
+    "INSTRUMENTATION_SAMPLE_RATE", default=0.1, cast=float
+)
@@ -0,0 +1,41 @@
+"""
+Query count harness for the API tests
+
+A list endpoint is read with a short page and with a full page and has to
+run the same number of queries both times, so a serializer field that
+loads a relation per row fails the test instead of slowing production.
+"""
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.test import APITestCase
+
+
+class QueryCountTestCase(APITestCase):
+    page_size = api_settings.PAGE_SIZE
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get(self, url: str, queries: int, params=None):
+        # every read goes to the database, cached pages would hide the queries
+        cache.clear()
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response
+
+    def assertListQueries(self, url: str, queries: int, add_row, params=None):
+        """
+        add_row creates one more row the endpoint lists
+        """
+        add_row()
+        short = self.get(url, queries, params).data["results"]
+        for _ in range(self.page_size):
+            add_row()
+        full = self.get(url, queries, params).data["results"]
+        self.assertLess(len(short), self.page_size)
+        self.assertEqual(len(full), self.page_size)
+
+    def assertDetailQueries(self, url: str, queries: int):
+        return self.get(url, queries)
@@ -16,8 +16,16 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from attendance.instrumentation import MetricsView, PrometheusMetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("users.urls")),
     path("plane/", include("flights.urls")),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path(
+        "metrics/prometheus/",
+        PrometheusMetricsView.as_view(),
+        name="metrics-prometheus",
+    ),
 ]
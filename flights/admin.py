@@ -1,5 +1,5 @@
 from django.contrib import admin
-from flights.models import Route, Flight, Book
+from flights.models import Route, Flight, Book, SeatInventory
 
 
 class RouteAdmin(admin.ModelAdmin):
@@ -53,3 +53,18 @@ class BookAdmin(admin.ModelAdmin):
     ]
 
 admin.site.register(Book, BookAdmin)
+
+
+class SeatInventoryAdmin(admin.ModelAdmin):
+    list_display = [
+        "flight",
+        "date",
+        "remaining",
+    ]
+    list_filter = [
+        "date",
+        "flight",
+    ]
+
+
+admin.site.register(SeatInventory, SeatInventoryAdmin)
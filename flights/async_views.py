@@ -0,0 +1,23 @@
+"""
+Async version of the flight search, see users.async_views
+"""
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+
+from flights.search import search_flights
+from flights.serializers import FlightSearchSerializer
+from users.async_views import api_view
+
+
+@api_view(authenticated=False)
+async def flight_search(request):
+    serializer = FlightSearchSerializer(data=request.GET)
+    serializer.is_valid(raise_exception=True)
+    query = serializer.validated_data
+    # a search is a few cache reads and at most one query per day, they
+    # run together in one worker thread
+    results = await sync_to_async(search_flights)(
+        query["origin"], query["destination"], query["days"], query["party"]
+    )
+    return JsonResponse(results, encoder=DjangoJSONEncoder, safe=False)
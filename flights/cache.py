@@ -0,0 +1,65 @@
+"""
+Read-through cache for the flight catalogue
+
+Cached pages are keyed on a catalogue version. Writes to routes and flights
+bump the version instead of hunting down keys, so every page cached before
+the write is simply never read again and expires on its own.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+VERSION_KEY = "flights:catalogue:version"
+TIMEOUT = 60 * 15
+SEARCH_TIMEOUT = 60
+
+
+def catalogue_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # start from the clock so a lost version never goes back to a number
+        # that older pages were cached under
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalogue_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        catalogue_version()
+
+
+def page_key(request) -> str:
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.md5(
+        f"{request.get_host()}?{params}".encode(), usedforsecurity=False
+    ).hexdigest()
+    name = request.resolver_match.url_name
+    return f"flights:catalogue:{catalogue_version()}:{name}:{digest}"
+
+
+def search_key(route_id, date) -> str:
+    return f"flights:search:{catalogue_version()}:{route_id}:{date.isoformat()}"
+
+
+def forget_search(route_id, date):
+    cache.delete(search_key(route_id, date))
+
+
+class CachedListMixin:
+    """
+    Serves list responses from the cache, one entry per view and query string
+    """
+
+    def list(self, request, *args, **kwargs):
+        key = page_key(request)
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, TIMEOUT)
+        return Response(data)
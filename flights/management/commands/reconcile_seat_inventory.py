@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from flights.models import SeatInventory
+
+
+class Command(BaseCommand):
+    help = "Recomputes the remaining seats of every flight from the bookings"
+
+    def handle(self, *args, **options):
+        corrected = SeatInventory.objects.reconcile()
+        self.stdout.write(
+            self.style.SUCCESS(f"Corrected {corrected} seat inventory counters")
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.3 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flights", "0003_alter_book_options_book_email"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(fields=["flight", "date"], name="book_flight_date_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.3 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flights", "0004_book_book_flight_date_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(fields=["created_at", "id"], name="book_cursor_idx"),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.1.3 on 2026-10-18 14:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flights", "0005_book_book_cursor_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeatInventory",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("remaining", models.PositiveIntegerField()),
+                (
+                    "flight",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="flights.flight",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date", "flight"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="seatinventory",
+            constraint=models.UniqueConstraint(
+                fields=("flight", "date"), name="unique_seat_inventory"
+            ),
+        ),
+    ]
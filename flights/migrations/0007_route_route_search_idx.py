@@ -0,0 +1,22 @@
+# Generated by Django 4.1.3 on 2026-10-18 14:52
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flights", "0006_seatinventory"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="route",
+            index=models.Index(
+                django.db.models.functions.text.Upper("start"),
+                django.db.models.functions.text.Upper("end"),
+                name="route_search_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.1.3 on 2026-10-18 15:20
+
+from django.db import migrations, models
+import users.abstracts
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flights", "0007_route_route_search_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="book",
+            name="id",
+            field=models.UUIDField(
+                default=users.abstracts.uuid7,
+                editable=False,
+                max_length=255,
+                primary_key=True,
+                serialize=False,
+                unique=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.16 on 2026-10-18 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flights", "0008_alter_book_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["name", "contact", "email", "flight", "date", "created_at"],
+                name="book_ordering_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=[
+                    "name",
+                    "route",
+                    "capacity",
+                    "description",
+                    "featured",
+                    "departure",
+                    "arrival",
+                    "price",
+                ],
+                name="flight_ordering_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="route",
+            index=models.Index(fields=["start", "end"], name="route_ordering_idx"),
+        ),
+    ]
@@ -1,5 +1,10 @@
-from django.db import models
-from users.abstracts import TimeStampedModel, UniversalIdModel
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Upper
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from users.abstracts import TimeOrderedIdModel, TimeStampedModel, UniversalIdModel
+from flights.cache import bump_catalogue_version, forget_search
 
 
 class Route(TimeStampedModel, UniversalIdModel):
@@ -16,6 +21,10 @@ class Route(TimeStampedModel, UniversalIdModel):
             "start",
             "end",
         ]
+        indexes = [
+            models.Index(Upper("start"), Upper("end"), name="route_search_idx"),
+            models.Index(fields=["start", "end"], name="route_ordering_idx"),
+        ]
 
 
 class Flight(TimeStampedModel, UniversalIdModel):
@@ -40,9 +49,24 @@ class Flight(TimeStampedModel, UniversalIdModel):
             "arrival",
             "price",
         ]
+        indexes = [
+            models.Index(
+                fields=[
+                    "name",
+                    "route",
+                    "capacity",
+                    "description",
+                    "featured",
+                    "departure",
+                    "arrival",
+                    "price",
+                ],
+                name="flight_ordering_idx",
+            ),
+        ]
 
 
-class Book(TimeStampedModel, UniversalIdModel):
+class Book(TimeStampedModel, TimeOrderedIdModel):
     name = models.CharField(max_length=400)
     contact = models.PositiveIntegerField()
     email = models.EmailField()
@@ -58,3 +82,156 @@ class Book(TimeStampedModel, UniversalIdModel):
             "date",
             "created_at",
         ]
+        indexes = [
+            models.Index(
+                fields=["name", "contact", "email", "flight", "date", "created_at"],
+                name="book_ordering_idx",
+            ),
+            models.Index(fields=["flight", "date"], name="book_flight_date_idx"),
+            models.Index(fields=["created_at", "id"], name="book_cursor_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # the seat taken in pre_save is given back if the write fails
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class FlightFull(IntegrityError):
+    """
+    No seat is left on the flight for the date
+    """
+
+
+class SeatInventoryManager(models.Manager):
+    def sold_out(self, flight, date) -> bool:
+        """
+        Lock free check used to turn buyers away before opening a transaction
+        """
+        return self.filter(flight=flight, date=date, remaining=0).exists()
+
+    def reserve(self, flight, date) -> bool:
+        """
+        Takes a seat, returns False when the flight is full. Runs when a
+        booking is saved, in the transaction of the save.
+        """
+        seats = self.filter(flight=flight, date=date)
+        if seats.filter(remaining__gt=0).update(remaining=F("remaining") - 1):
+            return True
+        if seats.exists():
+            return False
+
+        # first booking since the inventory was added, count the older ones
+        booked = Book.objects.filter(flight=flight, date=date).count()
+        remaining = max(flight.capacity - booked, 0)
+        try:
+            with transaction.atomic():
+                self.create(flight=flight, date=date, remaining=max(remaining - 1, 0))
+        except IntegrityError:
+            return self.reserve(flight, date)
+        return remaining > 0
+
+    def release(self, flight_id, date):
+        self.filter(
+            flight_id=flight_id, date=date, remaining__lt=F("flight__capacity")
+        ).update(remaining=F("remaining") + 1)
+
+    def reconcile(self, flights=None) -> int:
+        """
+        Recomputes the remaining seats from the bookings and returns the
+        number of counters that were wrong
+        """
+        with transaction.atomic():
+            inventory = self.select_for_update().select_related("flight")
+            bookings = Book.objects.all()
+            if flights is not None:
+                inventory = inventory.filter(flight__in=flights)
+                bookings = bookings.filter(flight__in=flights)
+            counters = {(seats.flight_id, seats.date): seats for seats in inventory}
+
+            # counted after the rows are locked so bookings that already took
+            # a seat have committed
+            booked = (
+                bookings.values("flight_id", "date", "flight__capacity")
+                .annotate(booked=Count("id"))
+                .order_by()
+            )
+            expected = {key: seats.flight.capacity for key, seats in counters.items()}
+            for row in booked:
+                key = (row["flight_id"], row["date"])
+                expected[key] = max(row["flight__capacity"] - row["booked"], 0)
+
+            changed, missing = [], []
+            for key, remaining in expected.items():
+                seats = counters.get(key)
+                if seats is None:
+                    missing.append(
+                        self.model(flight_id=key[0], date=key[1], remaining=remaining)
+                    )
+                elif seats.remaining != remaining:
+                    seats.remaining = remaining
+                    changed.append(seats)
+            self.bulk_update(changed, ["remaining"], batch_size=1000)
+            self.bulk_create(missing, batch_size=1000, ignore_conflicts=True)
+        return len(changed) + len(missing)
+
+
+class SeatInventory(TimeStampedModel, UniversalIdModel):
+    """
+    Seats left on a flight for a date
+    """
+
+    flight = models.ForeignKey(Flight, on_delete=models.CASCADE)
+    date = models.DateField(auto_now=False, auto_now_add=False)
+    remaining = models.PositiveIntegerField()
+
+    objects = SeatInventoryManager()
+
+    class Meta:
+        ordering = [
+            "date",
+            "flight",
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["flight", "date"], name="unique_seat_inventory"
+            ),
+        ]
+
+
+@receiver(pre_save, sender=Book)
+def seat_pre_save(sender, instance, **kwargs):
+    previous = None
+    if not instance._state.adding:
+        previous = (
+            Book.objects.filter(pk=instance.pk).values_list("flight_id", "date").first()
+        )
+    if previous == (instance.flight_id, instance.date):
+        return
+    if not SeatInventory.objects.reserve(instance.flight, instance.date):
+        raise FlightFull("Flight is fully booked")
+    if previous:
+        SeatInventory.objects.release(*previous)
+
+
+@receiver(post_delete, sender=Book)
+def seat_post_delete(sender, instance, **kwargs):
+    SeatInventory.objects.release(instance.flight_id, instance.date)
+
+
+@receiver([post_save, post_delete], sender=Book)
+def booking_changed(sender, instance, **kwargs):
+    route_id, date = instance.flight.route_id, instance.date
+    transaction.on_commit(lambda: forget_search(route_id, date))
+
+
+@receiver(post_save, sender=Flight)
+def capacity_post_save(sender, instance, created, **kwargs):
+    if not created:
+        SeatInventory.objects.reconcile(flights=[instance])
+
+
+@receiver([post_save, post_delete], sender=Route)
+@receiver([post_save, post_delete], sender=Flight)
+def catalogue_changed(sender, **kwargs):
+    transaction.on_commit(bump_catalogue_version)
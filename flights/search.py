@@ -0,0 +1,93 @@
+"""
+Availability search across routes and dates
+
+Flights and their remaining seats are looked up per (route, date) and cached
+under that key. A day that is not cached costs one query joining Route,
+Flight and SeatInventory, bookings drop the cached day of their route.
+"""
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from flights.cache import TIMEOUT, SEARCH_TIMEOUT, catalogue_version, search_key
+from flights.models import Book, Flight, Route, SeatInventory
+
+
+def find_routes(origin: str, destination: str) -> list:
+    key = f"flights:routes:{catalogue_version()}:{origin.lower()}:{destination.lower()}"
+    routes = cache.get(key)
+    if routes is None:
+        routes = list(
+            Route.objects.filter(
+                start__iexact=origin, end__iexact=destination
+            ).values_list("pk", flat=True)
+        )
+        cache.set(key, routes, TIMEOUT)
+    return routes
+
+
+def flights_on(routes: list, date) -> dict:
+    """
+    Flights of the routes with the seats left on the date, grouped by route
+    """
+    remaining = SeatInventory.objects.filter(flight=OuterRef("pk"), date=date)
+    # without an inventory row yet the seats are counted as reserve does
+    booked = (
+        Book.objects.filter(flight=OuterRef("pk"), date=date)
+        .order_by()
+        .values("flight")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    flights = (
+        Flight.objects.filter(route__in=routes)
+        .annotate(
+            remaining=Coalesce(
+                Subquery(remaining.values("remaining")[:1]),
+                Greatest(F("capacity") - Coalesce(Subquery(booked), 0), 0),
+            ),
+            origin=F("route__start"),
+            destination=F("route__end"),
+        )
+        .values(
+            "id",
+            "name",
+            "route_id",
+            "origin",
+            "destination",
+            "departure",
+            "arrival",
+            "price",
+            "remaining",
+        )
+        .order_by("departure", "name")
+    )
+    grouped = {route: [] for route in routes}
+    for flight in flights:
+        flight["date"] = date
+        grouped[flight["route_id"]].append(flight)
+    return grouped
+
+
+def search_flights(origin: str, destination: str, days: list, party: int = 1):
+    routes = find_routes(origin, destination)
+    if not routes:
+        return []
+
+    keys = {search_key(route, day): (route, day) for day in days for route in routes}
+    cached = cache.get_many(keys)
+    for day in {day for key, (_, day) in keys.items() if key not in cached}:
+        fresh = {
+            search_key(route, day): flights
+            for route, flights in flights_on(routes, day).items()
+        }
+        cache.set_many(fresh, SEARCH_TIMEOUT)
+        cached.update(fresh)
+
+    results = [
+        flight
+        for key in keys
+        for flight in cached[key]
+        if flight["remaining"] >= party
+    ]
+    return sorted(results, key=lambda flight: (flight["date"], flight["departure"]))
@@ -1,4 +1,6 @@
-from flights.models import Route, Flight, Book
+from datetime import timedelta
+
+from flights.models import Route, Flight, Book, FlightFull, SeatInventory
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
@@ -105,4 +107,48 @@ class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = ("id", "name", "contact", "email", "flight", "date", "created_at")
-        read_only_fields = ("id", "created_at")
\ No newline at end of file
+        read_only_fields = ("id", "created_at")
+
+    def create(self, validated_data):
+        if SeatInventory.objects.sold_out(
+            validated_data["flight"], validated_data["date"]
+        ):
+            raise serializers.ValidationError("Flight is fully booked")
+        return super().create(validated_data)
+
+    def save(self, **kwargs):
+        # the booking takes its seat when it is saved, and moves it on update
+        try:
+            return super().save(**kwargs)
+        except FlightFull:
+            raise serializers.ValidationError("Flight is fully booked")
+
+
+class FlightSearchSerializer(serializers.Serializer):
+    """
+    Validates the search query, either a date or a date_from and date_to range
+    """
+
+    origin = serializers.CharField(max_length=400)
+    destination = serializers.CharField(max_length=400)
+    date = serializers.DateField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    party = serializers.IntegerField(min_value=1, default=1)
+
+    max_days = 31
+
+    def validate(self, attrs):
+        start = attrs.get("date") or attrs.get("date_from")
+        end = attrs.get("date") or attrs.get("date_to") or start
+        if start is None:
+            raise serializers.ValidationError("Provide a date or a date_from")
+        if end < start:
+            raise serializers.ValidationError("date_to must not be before date_from")
+        if (end - start).days >= self.max_days:
+            raise serializers.ValidationError(
+                f"Search at most {self.max_days} days at a time"
+            )
+        days = (end - start).days + 1
+        attrs["days"] = [start + timedelta(days=n) for n in range(days)]
+        return attrs
@@ -0,0 +1,147 @@
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from flights.models import Book, Flight, Route
+
+User = get_user_model()
+
+DAY = date(2030, 1, 1)
+
+
+class CacheTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            "admin", "admin@example.com", "Pass1!word", name="Admin", is_staff=True
+        )
+        cls.route = Route.objects.create(name="Route", start="Nairobi", end="Mombasa")
+        cls.flight = Flight.objects.create(
+            name="Flight",
+            route=cls.route,
+            departure=time(6),
+            arrival=time(7),
+            capacity=3,
+            description="Flight",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+
+class CatalogueCacheTests(CacheTestCase):
+    def names(self, url_name) -> list:
+        response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return [item["name"] for item in response.data["results"]]
+
+    def test_route_created(self):
+        self.assertEqual(self.names("route-list"), ["Route"])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("route-list"),
+                {"name": "Coast", "start": "Mombasa", "end": "Malindi"},
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(self.names("route-list")), ["Coast", "Route"])
+
+    def test_route_updated_and_deleted(self):
+        self.assertEqual(self.names("route-list"), ["Route"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse("route-detail", args=[self.route.id]), {"name": "Renamed"}
+            )
+        self.assertEqual(self.names("route-list"), ["Renamed"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("route-detail", args=[self.route.id]))
+        self.assertEqual(self.names("route-list"), [])
+
+    def test_flight_updated(self):
+        self.assertEqual(self.names("flight-list"), ["Flight"])
+        self.assertEqual(self.names("featured-flight"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse("flight-detail", args=[self.flight.id]),
+                {"name": "Featured", "featured": True},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.names("flight-list"), ["Featured"])
+        self.assertEqual(self.names("featured-flight"), ["Featured"])
+
+    def test_cached_until_the_write_commits(self):
+        self.assertEqual(self.names("flight-list"), ["Flight"])
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.flight.delete()
+        self.assertEqual(self.names("flight-list"), ["Flight"])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.names("flight-list"), [])
+
+
+class SearchCacheTests(CacheTestCase):
+    def remaining(self, day=DAY):
+        response = self.client.get(
+            reverse("flight-search"),
+            {"origin": "Nairobi", "destination": "Mombasa", "date": day.isoformat()},
+        )
+        self.assertEqual(response.status_code, 200)
+        return [flight["remaining"] for flight in response.data]
+
+    def book(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("book-create"),
+                {
+                    "name": "Passenger",
+                    "contact": 711000000,
+                    "email": "passenger@example.com",
+                    "flight": self.flight.name,
+                    "date": DAY.isoformat(),
+                },
+            )
+        self.assertEqual(response.status_code, 201)
+        return response.data["id"]
+
+    def test_booking_drops_the_cached_day(self):
+        self.assertEqual(self.remaining(), [3])
+        self.assertEqual(self.remaining(date(2030, 1, 2)), [3])
+        booking = self.book()
+        self.assertEqual(self.remaining(), [2])
+        self.assertEqual(self.remaining(date(2030, 1, 2)), [3])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("book-detail", args=[booking]))
+        self.assertEqual(self.remaining(), [3])
+
+    def test_sold_out_day_is_left_out(self):
+        for _ in range(3):
+            self.book()
+        self.assertEqual(self.remaining(), [])
+
+    def test_capacity_change(self):
+        self.book()
+        self.assertEqual(self.remaining(), [2])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse("flight-detail", args=[self.flight.id]), {"capacity": 5}
+            )
+        self.assertEqual(self.remaining(), [4])
+
+    def test_bookings_without_inventory(self):
+        # rows written without signals have no inventory row for the day
+        Book.objects.bulk_create(
+            Book(
+                name="Passenger",
+                contact=711000000,
+                email="passenger@example.com",
+                flight=self.flight,
+                date=DAY,
+            )
+            for _ in range(2)
+        )
+        self.assertEqual(self.remaining(), [1])
+        self.assertEqual(self.remaining(date(2030, 1, 2)), [3])
@@ -0,0 +1,79 @@
+import itertools
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from attendance.testing import QueryCountTestCase
+from flights.models import Book, Flight, Route
+
+User = get_user_model()
+
+
+class FlightsQueryCountTests(QueryCountTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.numbers = itertools.count()
+        cls.admin = User.objects.create_user(
+            "admin", "admin@example.com", "Pass1!word", name="Admin", is_staff=True
+        )
+        cls.route = Route.objects.create(name="Route", start="Nairobi", end="Mombasa")
+        cls.flight = Flight.objects.create(
+            name="Flight",
+            route=cls.route,
+            departure=time(6),
+            arrival=time(7),
+            description="Flight",
+            featured=True,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+
+    def add_route(self):
+        n = next(self.numbers)
+        return Route.objects.create(name=f"Route {n}", start=f"A{n}", end=f"B{n}")
+
+    def add_flight(self):
+        n = next(self.numbers)
+        return Flight.objects.create(
+            name=f"Flight {n}",
+            route=self.add_route(),
+            departure=time(6),
+            arrival=time(7),
+            description="Flight",
+            featured=True,
+        )
+
+    def add_booking(self):
+        n = next(self.numbers)
+        return Book.objects.create(
+            name=f"Passenger {n}",
+            contact=700000000 + n,
+            email=f"p{n}@example.com",
+            flight=self.add_flight(),
+            date=date(2030, 1, 1),
+        )
+
+    def test_routes(self):
+        self.assertListQueries(reverse("route-list"), 2, self.add_route)
+
+    def test_route_detail(self):
+        self.assertDetailQueries(reverse("route-detail", args=[self.route.id]), 1)
+
+    def test_flights(self):
+        self.assertListQueries(reverse("flight-list"), 2, self.add_flight)
+
+    def test_featured_flights(self):
+        self.assertListQueries(reverse("featured-flight"), 2, self.add_flight)
+
+    def test_flight_detail(self):
+        self.assertDetailQueries(reverse("flight-detail", args=[self.flight.id]), 1)
+
+    def test_bookings(self):
+        self.assertListQueries(reverse("book-list"), 2, self.add_booking)
+
+    def test_booking_detail(self):
+        booking = self.add_booking()
+        self.assertDetailQueries(reverse("book-detail", args=[booking.id]), 1)
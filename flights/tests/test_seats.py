@@ -0,0 +1,195 @@
+import threading
+from datetime import date, time
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from flights.models import Book, Flight, FlightFull, Route, SeatInventory
+
+User = get_user_model()
+
+DAY = date(2030, 1, 1)
+
+
+def create_flight(name="Flight", capacity=2) -> Flight:
+    route, _ = Route.objects.get_or_create(name="Route", start="Nairobi", end="Mombasa")
+    return Flight.objects.create(
+        name=name,
+        route=route,
+        departure=time(6),
+        arrival=time(7),
+        capacity=capacity,
+        description="Flight",
+    )
+
+
+class SeatInventoryTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            "admin", "admin@example.com", "Pass1!word", name="Admin", is_staff=True
+        )
+        cls.flight = create_flight()
+
+    def book(self, day=DAY, flight=None):
+        return self.client.post(
+            reverse("book-create"),
+            {
+                "name": "Passenger",
+                "contact": 711000000,
+                "email": "passenger@example.com",
+                "flight": (flight or self.flight).name,
+                "date": day.isoformat(),
+            },
+        )
+
+    def remaining(self, day=DAY, flight=None) -> int:
+        return SeatInventory.objects.get(
+            flight=flight or self.flight, date=day
+        ).remaining
+
+    def test_sold_out(self):
+        self.assertEqual(self.book().status_code, 201)
+        self.assertEqual(self.book().status_code, 201)
+        response = self.book()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, ["Flight is fully booked"])
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(self.remaining(), 0)
+
+    def test_bookings_outside_the_api_take_a_seat(self):
+        self.assertEqual(self.book().status_code, 201)
+        booking = Book.objects.create(
+            name="Desk",
+            contact=1,
+            email="desk@example.com",
+            flight=self.flight,
+            date=DAY,
+        )
+        self.assertEqual(self.remaining(), 0)
+        self.assertEqual(self.book().status_code, 400)
+        with self.assertRaises(FlightFull):
+            Book.objects.create(
+                name="Desk",
+                contact=1,
+                email="desk@example.com",
+                flight=self.flight,
+                date=DAY,
+            )
+
+        booking.delete()
+        self.assertEqual(self.remaining(), 1)
+        self.assertEqual(self.book().status_code, 201)
+        self.assertEqual(self.book().status_code, 400)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_release_stops_at_capacity(self):
+        SeatInventory.objects.create(flight=self.flight, date=DAY, remaining=2)
+        SeatInventory.objects.release(self.flight.id, DAY)
+        self.assertEqual(self.remaining(), 2)
+
+    def test_reserve_counts_older_bookings(self):
+        # written without signals, before the flight had an inventory row
+        Book.objects.bulk_create(
+            [
+                Book(
+                    name="Old",
+                    contact=1,
+                    email="old@example.com",
+                    flight=self.flight,
+                    date=DAY,
+                )
+            ]
+        )
+        self.assertTrue(SeatInventory.objects.reserve(self.flight, DAY))
+        self.assertEqual(self.remaining(), 0)
+        self.assertFalse(SeatInventory.objects.reserve(self.flight, DAY))
+
+    def test_update_moves_the_seat(self):
+        self.client.force_authenticate(self.admin)
+        booking = self.book().data
+        other = date(2030, 1, 2)
+        response = self.client.patch(
+            reverse("book-detail", kwargs={"id": booking["id"]}),
+            {"date": other.isoformat()},
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.remaining(), 2)
+        self.assertEqual(self.remaining(other), 1)
+
+    def test_update_to_a_full_flight_keeps_the_seat(self):
+        self.client.force_authenticate(self.admin)
+        full = create_flight("Full", capacity=1)
+        self.assertEqual(self.book(flight=full).status_code, 201)
+        booking = self.book().data
+        response = self.client.patch(
+            reverse("book-detail", kwargs={"id": booking["id"]}), {"flight": "Full"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Book.objects.get(pk=booking["id"]).flight, self.flight)
+        self.assertEqual(self.remaining(), 1)
+        self.assertEqual(self.remaining(flight=full), 0)
+
+    def test_reconcile(self):
+        self.assertEqual(self.book().status_code, 201)
+        SeatInventory.objects.update(remaining=2)
+        Book.objects.bulk_create(
+            [
+                Book(
+                    name="Old",
+                    contact=1,
+                    email="old@example.com",
+                    flight=self.flight,
+                    date=date(2030, 1, 2),
+                )
+            ]
+        )
+        self.assertEqual(SeatInventory.objects.reconcile(), 2)
+        self.assertEqual(self.remaining(), 1)
+        self.assertEqual(self.remaining(date(2030, 1, 2)), 1)
+        self.assertEqual(SeatInventory.objects.reconcile(), 0)
+
+    def test_capacity_change_reconciles(self):
+        self.assertEqual(self.book().status_code, 201)
+        self.flight.capacity = 3
+        self.flight.save()
+        self.assertEqual(self.remaining(), 2)
+
+
+@skipUnless(connection.vendor == "postgresql", "Row locks are checked on PostgreSQL")
+class ConcurrentBookingTests(TransactionTestCase):
+    def test_last_seat_goes_to_one_booking(self):
+        flight = create_flight(capacity=1)
+        SeatInventory.objects.create(flight=flight, date=DAY, remaining=1)
+        barrier = threading.Barrier(4)
+        booked = []
+
+        def book(n):
+            barrier.wait()
+            try:
+                Book.objects.create(
+                    name="Passenger",
+                    contact=n,
+                    email="p@example.com",
+                    flight=flight,
+                    date=DAY,
+                )
+                booked.append(n)
+            except FlightFull:
+                pass
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=book, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(booked), 1)
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertEqual(SeatInventory.objects.get(flight=flight).remaining, 0)
@@ -1,11 +1,13 @@
 from django.urls import path
 
+from flights.async_views import flight_search
 from flights.views import (
     RouteListCreateView,
     RouteDetailView,
     FlightListCreateView,
     FlightDetailView,
     FlightFeaturedView,
+    FlightSearchView,
     BookCreateView,
     BookDetailView,
     BookListView,
@@ -17,6 +19,8 @@ urlpatterns = [
     path("flight/", FlightListCreateView.as_view(), name="flight-list"),
     path("flight/<str:id>/", FlightDetailView.as_view(), name="flight-detail"),
     path("featured/", FlightFeaturedView.as_view(), name="featured-flight"),
+    path("search/", FlightSearchView.as_view(), name="flight-search"),
+    path("async/search/", flight_search, name="flight-search-async"),
     path("book/", BookCreateView.as_view(), name="book-create"),
     path("book/list/", BookListView.as_view(), name="book-list"),
     path("book/<str:id>/", BookDetailView.as_view(), name="book-detail"),
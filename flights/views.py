@@ -6,11 +6,15 @@ from flights.serializers import (
     RouteSerializer,
     FlightSerializer,
     BookSerializer,
+    FlightSearchSerializer,
 )
 from flights.models import Route, Flight, Book
+from flights.cache import CachedListMixin
+from flights.search import search_flights
+from users.pagination import OptionalCursorPagination
 
 
-class RouteListCreateView(generics.ListCreateAPIView):
+class RouteListCreateView(CachedListMixin, generics.ListCreateAPIView):
     serializer_class = RouteSerializer
     queryset = Route.objects.all()
 
@@ -28,14 +32,14 @@ class RouteDetailView(generics.RetrieveUpdateDestroyAPIView):
         )
 
 
-class FlightListCreateView(generics.ListCreateAPIView):
+class FlightListCreateView(CachedListMixin, generics.ListCreateAPIView):
     serializer_class = FlightSerializer
-    queryset = Flight.objects.all()
+    queryset = Flight.objects.select_related("route")
 
 
 class FlightDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = FlightSerializer
-    queryset = Flight.objects.all()
+    queryset = Flight.objects.select_related("route")
     lookup_field = "id"
 
     def delete(self, request, *args, **kwargs):
@@ -45,23 +49,42 @@ class FlightDetailView(generics.RetrieveUpdateDestroyAPIView):
             status=status.HTTP_204_NO_CONTENT,
         )
 
-class FlightFeaturedView(generics.ListAPIView):
+class FlightFeaturedView(CachedListMixin, generics.ListAPIView):
     serializer_class = FlightSerializer
     
     def get_queryset(self):
-        return Flight.objects.filter(featured=True)
+        return Flight.objects.filter(featured=True).select_related("route")
+
+class FlightSearchView(generics.GenericAPIView):
+    """
+    Flights between an origin and a destination with enough seats left for
+    the party on a date or over a range of dates
+    """
+
+    serializer_class = FlightSearchSerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+        return Response(
+            search_flights(
+                query["origin"], query["destination"], query["days"], query["party"]
+            )
+        )
 
 class BookCreateView(generics.CreateAPIView):
     serializer_class = BookSerializer
-    queryset = Book.objects.all()
+    queryset = Book.objects.select_related("flight")
 
 class BookListView(generics.ListAPIView):
     serializer_class = BookSerializer
-    queryset = Book.objects.all()
+    queryset = Book.objects.select_related("flight")
+    pagination_class = OptionalCursorPagination
     # permission_classes = [IsAdminUser,]
 
 class BookDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = BookSerializer
-    queryset = Book.objects.all()
+    queryset = Book.objects.select_related("flight")
     permission_classes = [IsAdminUser]
     lookup_field = "id"
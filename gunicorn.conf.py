@@ -0,0 +1,34 @@
+"""
+Gunicorn settings for the web process
+
+The app is served through WSGI by threaded workers, each request holds a
+thread and database connections are kept open for DATABASE_CONN_MAX_AGE
+seconds. GUNICORN_THREADS is the number of threads per worker and
+WEB_CONCURRENCY the number of worker processes.
+
+The async views under api/async/ and plane/async/ are only worth serving
+under ASGI, opt in with GUNICORN_APP=attendance.asgi:application and
+GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker. Under ASGI every
+request opens its own database connection, put PgBouncer in front with
+DATABASE_POOLER=pgbouncer.
+Run locally with:
+
+    gunicorn -c gunicorn.conf.py
+"""
+import multiprocessing
+
+from decouple import config
+
+wsgi_app = config("GUNICORN_APP", default="attendance.wsgi:application")
+worker_class = config("GUNICORN_WORKER_CLASS", default="gthread")
+threads = config("GUNICORN_THREADS", default=4, cast=int)
+workers = config(
+    "WEB_CONCURRENCY", default=multiprocessing.cpu_count() * 2 + 1, cast=int
+)
+bind = f"0.0.0.0:{config('PORT', default='8000')}"
+timeout = config("GUNICORN_TIMEOUT", default=60, cast=int)
+keepalive = 5
+# recycle workers now and then so a slow leak never grows unbounded
+max_requests = 2000
+max_requests_jitter = 200
+accesslog = "-"
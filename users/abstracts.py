@@ -1,6 +1,59 @@
+import os
+import time
 import uuid
 
-from django.db import models
+from django.db import IntegrityError, connections, models
+
+
+def uuid7() -> uuid.UUID:
+    """
+    A version 7 UUID, the first 48 bits are the unix time in milliseconds so
+    ids made later sort after the earlier ones
+    """
+    milliseconds = time.time_ns() // 1_000_000
+    random = int.from_bytes(os.urandom(10), "big")
+    value = (milliseconds & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76 | (random >> 68) << 64
+    value |= 0b10 << 62 | random & 0x3FFFFFFFFFFFFFFF
+    return uuid.UUID(int=value)
+
+
+def violated_constraint(error: IntegrityError, model, using="default"):
+    """
+    The unique constraint of the model the IntegrityError reports, the name
+    of a Meta constraint or of a unique field, None for any other error
+    """
+    table = model._meta.db_table
+    fields = {field.column: field for field in model._meta.concrete_fields}
+    diag = getattr(error.__cause__, "diag", None)
+    if diag is not None:
+        # PostgreSQL names the constraint, unique fields only have a
+        # generated name so their columns are looked up
+        if diag.table_name != table:
+            return None
+        if diag.constraint_name in {c.name for c in model._meta.constraints}:
+            return diag.constraint_name
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            found = connection.introspection.get_constraints(cursor, table)
+        columns = (found.get(diag.constraint_name) or {}).get("columns") or []
+    else:
+        # SQLite only lists the columns, UNIQUE constraint failed: table.column
+        _, _, failed = str(error).partition("UNIQUE constraint failed: ")
+        columns = [column.strip() for column in failed.split(",") if failed]
+        if not columns or not all(c.startswith(f"{table}.") for c in columns):
+            return None
+        columns = [column[len(table) + 1:] for column in columns]
+        names = sorted(fields[column].name for column in columns if column in fields)
+        for constraint in model._meta.constraints:
+            if getattr(constraint, "fields", None) and names == sorted(
+                constraint.fields
+            ):
+                return constraint.name
+
+    if len(columns) == 1 and columns[0] in fields and fields[columns[0]].unique:
+        return fields[columns[0]].name
+    return None
 
 
 class TimeStampedModel(models.Model):
@@ -22,3 +75,21 @@ class UniversalIdModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class TimeOrderedIdModel(UniversalIdModel):
+    """
+    UniversalIdModel with time ordered ids, new rows go to the right edge of
+    the primary key index instead of a random page
+    """
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid7,
+        editable=False,
+        unique=True,
+        max_length=255,
+    )
+
+    class Meta:
+        abstract = True
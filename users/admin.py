@@ -6,6 +6,9 @@ from users.models import (
     RegisteredStudents,
     MarkStudents,
     RegisterUnits,
+    AttendanceCounter,
+    AttendanceSummary,
+    ClassSession,
 )
 
 User = get_user_model()
@@ -90,6 +93,7 @@ class MarkStudentsAdmin(admin.ModelAdmin):
         "unit",
         "status",
         "total",
+        "session",
     ]
     list_filter = [
         "unit",
@@ -98,3 +102,53 @@ class MarkStudentsAdmin(admin.ModelAdmin):
 
 
 admin.site.register(MarkStudents, MarkStudentsAdmin)
+
+
+class AttendanceCounterAdmin(admin.ModelAdmin):
+    list_display = [
+        "unit",
+        "student",
+        "present",
+        "absent",
+    ]
+    list_filter = [
+        "unit",
+    ]
+
+
+admin.site.register(AttendanceCounter, AttendanceCounterAdmin)
+
+
+class AttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = [
+        "unit",
+        "student",
+        "week",
+        "present",
+        "absent",
+    ]
+    list_filter = [
+        "unit",
+        "week",
+    ]
+
+
+admin.site.register(AttendanceSummary, AttendanceSummaryAdmin)
+
+
+class ClassSessionAdmin(admin.ModelAdmin):
+    list_display = [
+        "unit",
+        "date",
+        "slot",
+        "closed_at",
+        "present",
+        "absent",
+    ]
+    list_filter = [
+        "unit",
+        "date",
+    ]
+
+
+admin.site.register(ClassSession, ClassSessionAdmin)
@@ -0,0 +1,154 @@
+"""
+Async versions of the read heavy endpoints
+
+Served under ASGI, opt in through gunicorn.conf.py. Their queries run
+through sync_to_async and they answer GET only, mirroring the responses of
+the DRF views they are named after.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import APIException, AuthenticationFailed
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from users.authentication import TokenUserAuthentication
+from users.models import Units
+from users.roster import TIMEOUT, roster_key
+from users.serializers import AttendanceSerializer, UnitAttendanceSerializer
+from users.statistics import (
+    attendance_records,
+    export_chunk,
+    export_lines,
+    export_rows,
+    sessions_held,
+    student_attendance,
+    unit_attendance,
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+async def authenticate(request):
+    try:
+        result = await sync_to_async(TokenUserAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def api_view(authenticated: bool = True):
+    """
+    Authenticates the bearer token like the DRF views and turns API errors
+    into JSON responses
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != "GET":
+                return JsonResponse({"detail": "Method not allowed."}, status=405)
+            request.user = await authenticate(request) or AnonymousUser()
+            if authenticated and not request.user.is_authenticated:
+                return JsonResponse(
+                    {"detail": "Authentication credentials were not provided."},
+                    status=401,
+                )
+            try:
+                return await view(request, *args, **kwargs)
+            except APIException as error:
+                return JsonResponse(error.detail, status=error.status_code, safe=False)
+
+        return wrapper
+
+    return decorator
+
+
+async def paginate(request, queryset) -> dict:
+    """
+    The page of the queryset in the same shape as PageNumberPagination
+    """
+    size = api_settings.PAGE_SIZE
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    count = await queryset.acount()
+    results = [row async for row in queryset[(page - 1) * size:page * size]]
+
+    url = request.build_absolute_uri()
+    next_url = previous = None
+    if page * size < count:
+        next_url = replace_query_param(url, "page", page + 1)
+    if page == 2:
+        previous = remove_query_param(url, "page")
+    elif page > 2:
+        previous = replace_query_param(url, "page", page - 1)
+    return {"count": count, "next": next_url, "previous": previous, "results": results}
+
+
+async def statistics(request, grouping, serializer_class):
+    records = attendance_records(request.GET, request.user)
+    page = await paginate(request, grouping(records))
+    held = {
+        code: count async for code, count in sessions_held(request.GET, request.user)
+    }
+    page["results"] = serializer_class(
+        page["results"], many=True, context={"held": held}
+    ).data
+    return JsonResponse(page, encoder=DjangoJSONEncoder)
+
+
+@api_view()
+async def attendance_statistics(request):
+    return await statistics(request, student_attendance, AttendanceSerializer)
+
+
+@api_view()
+async def unit_attendance_statistics(request):
+    return await statistics(request, unit_attendance, UnitAttendanceSerializer)
+
+
+@api_view()
+async def lecturer_roster(request):
+    key = await sync_to_async(roster_key)(request.user.id)
+    roster = await cache.aget(key)
+    if roster is None:
+        roster = await sync_to_async(Units.objects.roster)(request.user.id)
+        await cache.aset(key, roster, TIMEOUT)
+    return JsonResponse(roster, encoder=DjangoJSONEncoder, safe=False)
+
+
+async def export_stream(rows, output: str):
+    """
+    The export lines, each chunk of rows is read by key in a worker thread
+    """
+    after, header = None, True
+    while True:
+        chunk, after = await sync_to_async(export_chunk)(
+            rows, after, EXPORT_CHUNK_SIZE
+        )
+        for line in export_lines(chunk, output, header):
+            yield line
+        if after is None:
+            return
+        header = False
+
+
+@api_view()
+async def attendance_export(request):
+    rows = await sync_to_async(export_rows)(request.GET, request.user)
+    output = request.GET.get("output", "csv")
+    if output == "ndjson":
+        content_type, filename = "application/x-ndjson", "attendance.ndjson"
+    else:
+        content_type, filename = "text/csv", "attendance.csv"
+    response = StreamingHttpResponse(
+        export_stream(rows, output), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,73 @@
+"""
+Bearer token authentication without a user query
+
+The user of a request is built from the claims of its access token and the
+cached user state of users.revocation. Views and permissions only read the
+id, the username and the staff status, the user row is loaded the first
+time any other field is read.
+"""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser as BaseTokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from users.revocation import user_state
+
+
+class TokenUser(BaseTokenUser):
+    """
+    The user of an access token
+    Tokens issued before the username claim fall back to the user row for
+    it. The staff status is set from the cached user state on authentication.
+    """
+
+    @cached_property
+    def id(self):
+        return uuid.UUID(str(self.token[api_settings.USER_ID_CLAIM]))
+
+    @cached_property
+    def username(self):
+        if "username" in self.token:
+            return self.token["username"]
+        return self.user.username
+
+    @cached_property
+    def is_staff(self):
+        return self.user.is_staff
+
+    @cached_property
+    def is_superuser(self):
+        return self.user.is_superuser
+
+    @cached_property
+    def user(self):
+        return get_user_model().objects.get(pk=self.id)
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+
+class TokenUserAuthentication(JWTAuthentication):
+    """
+    Authenticates the access token and reads whether the user still exists
+    and is staff from a short lived cache instead of loading the user
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        state = user_state(user_id)
+        if state is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        user = TokenUser(validated_token)
+        user.is_staff = state["is_staff"]
+        return user
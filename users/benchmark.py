@@ -0,0 +1,683 @@
+"""
+Seeded data and endpoint timings for the benchmark commands
+
+seed() fills the database with users, units, students, enrolments, marks,
+routes, flights and bookings in proportion to a scale, the number of marks.
+run() drives the API through the Django test client and records latency
+percentiles, query counts and the peak allocation per endpoint. Run both
+against a disposable database, the write endpoints add rows on every call,
+the commands refuse to run unless DEBUG is on or they are told the
+database is disposable.
+"""
+import random
+import secrets
+import subprocess
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, time as dtime, timedelta
+from itertools import islice
+from urllib.parse import urlencode
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from flights.models import Book, Flight, Route, SeatInventory
+from users.models import (
+    AttendanceCounter,
+    AttendanceSummary,
+    ClassSession,
+    MarkStudents,
+    Profile,
+    RegisteredStudents,
+    RegisterUnits,
+    Units,
+)
+from users.statistics import (
+    attendance_records,
+    export_rows,
+    sessions_held,
+    student_attendance,
+    unit_attendance,
+)
+from users.tokens import RefreshToken
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+UNITS_PER_STUDENT = 5
+DISPOSABLE_FLAG = "--i-know-this-is-disposable"
+FIXTURE_PREFIX = "bench-"
+
+
+def check_disposable(disposable: bool):
+    if not (settings.DEBUG or disposable):
+        raise CommandError(
+            "The benchmarks write to the database, run them with DEBUG on or "
+            f"pass {DISPOSABLE_FLAG} for a database that can be thrown away"
+        )
+
+
+def random_password() -> str:
+    # passes the password validators whatever the random part holds
+    return f"{secrets.token_urlsafe(16)}aA1!"
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def insert(model, objects) -> int:
+    inserted = 0
+    for chunk in chunked(objects, BATCH_SIZE):
+        model.objects.bulk_create(chunk)
+        inserted += len(chunk)
+    return inserted
+
+
+@contextmanager
+def historical_timestamps(*models):
+    """
+    Lets bulk_create keep the created_at values of the seeded rows
+    """
+    fields = [model._meta.get_field("created_at") for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def plan(scale: int) -> dict:
+    students = max(scale // 50, 50)
+    units = max(scale // 5000, UNITS_PER_STUDENT)
+    routes = max(scale // 10000, 10)
+    return {
+        "marks": scale,
+        "students": students,
+        "units": units,
+        "lecturers": max(units // 4, 1),
+        "routes": routes,
+        "flights": routes * 3,
+        "bookings": max(scale // 10, 100),
+    }
+
+
+def seed(scale: int, seed_value: int = 0) -> dict:
+    sizes = plan(scale)
+    rng = random.Random(seed_value)
+    tag = uuid.uuid4().hex[:6]
+    now = timezone.now()
+    counts = {}
+
+    # nobody logs in as the seeded lecturers
+    password = make_password(None)
+    lecturers = [
+        User(
+            username=f"{tag}l{n}",
+            email=f"{tag}l{n}@bench.test",
+            name=f"Lecturer {n}",
+            password=password,
+        )
+        for n in range(sizes["lecturers"])
+    ]
+    counts["users"] = insert(User, lecturers)
+    counts["profiles"] = insert(Profile, (Profile(user=user) for user in lecturers))
+
+    units = [
+        Units(
+            code=f"{tag}{n}", name=f"Unit {n}", lecturer=lecturers[n % len(lecturers)]
+        )
+        for n in range(sizes["units"])
+    ]
+    counts["units"] = insert(Units, units)
+
+    students = [
+        RegisteredStudents(regnumber=f"{tag}/{n:08d}", sname=f"Student {n}")
+        for n in range(sizes["students"])
+    ]
+    counts["students"] = insert(RegisteredStudents, students)
+
+    pairs = [
+        (student, units[(index + offset) % len(units)])
+        for index, student in enumerate(students)
+        for offset in range(UNITS_PER_STUDENT)
+    ]
+    counts["enrolments"] = insert(
+        RegisterUnits, (RegisterUnits(student=s, unit=u) for s, u in pairs)
+    )
+
+    # one closed session a day for every unit, going back one day per mark
+    per_pair, extra = divmod(sizes["marks"], len(pairs))
+    sessions = {
+        (unit.id, day): ClassSession(
+            unit=unit,
+            date=timezone.localdate(now - timedelta(days=day + 1)),
+            closed_at=now - timedelta(days=day + 1),
+        )
+        for unit in units
+        for day in range(per_pair + bool(extra))
+    }
+    counts["sessions"] = insert(ClassSession, sessions.values())
+
+    def marks():
+        for index, (student, unit) in enumerate(pairs):
+            for day in range(per_pair + (index < extra)):
+                yield MarkStudents(
+                    student=student,
+                    unit=unit,
+                    session=sessions[(unit.id, day)],
+                    status=rng.random() < 0.8,
+                    created_at=now - timedelta(days=day + 1),
+                )
+
+    routes = [
+        Route(name=f"{tag} route {n}", start=f"City {n}", end=f"City {n + 1}")
+        for n in range(sizes["routes"])
+    ]
+    flights = [
+        Flight(
+            name=f"{tag} flight {n}",
+            route=routes[n % len(routes)],
+            departure=dtime(6 + n % 12),
+            arrival=dtime(8 + n % 12),
+            capacity=rng.randint(50, 300),
+            description="Benchmark flight",
+            price=rng.randint(50, 500),
+        )
+        for n in range(sizes["flights"])
+    ]
+
+    def bookings():
+        for n in range(sizes["bookings"]):
+            yield Book(
+                name=f"Passenger {n}",
+                contact=700000000 + n,
+                email=f"{tag}p{n}@bench.test",
+                flight=flights[n % len(flights)],
+                date=now.date() + timedelta(days=n % 60),
+            )
+
+    with historical_timestamps(MarkStudents):
+        counts["marks"] = insert(MarkStudents, marks())
+    counts["routes"] = insert(Route, routes)
+    counts["flights"] = insert(Flight, flights)
+    counts["bookings"] = insert(Book, bookings())
+
+    # bulk_create skips the signals that keep the aggregates in step
+    AttendanceCounter.objects.rebuild()
+    AttendanceSummary.objects.rebuild()
+    ClassSession.objects.recount()
+    RegisterUnits.objects.refresh_counts()
+    SeatInventory.objects.reconcile()
+    return counts
+
+
+def hot_querysets(lecturer, unit, student, flight) -> dict:
+    """
+    The querysets behind the API that have to be served from an index, the
+    list endpoints with the ordering of their model
+    """
+    today = timezone.localdate()
+    # a whole week is read from the summaries, a part of one from the marks
+    monday = today - timedelta(days=today.weekday())
+    weeks = {"start": monday - timedelta(weeks=4), "end": monday - timedelta(days=1)}
+    days = {"start": monday - timedelta(days=3), "end": monday + timedelta(days=1)}
+    return {
+        "student-list": RegisteredStudents.objects.all()[:10],
+        "units-list": Units.objects.select_related("lecturer")[:10],
+        "session-list": ClassSession.objects.filter(unit__lecturer=lecturer)[:10],
+        "mark-list": MarkStudents.objects.all()[:10],
+        "marked-detail": MarkStudents.objects.filter(unit__lecturer=lecturer)[:10],
+        "mark-once-per-session": MarkStudents.objects.filter(
+            student=student, session__unit=unit, session__date=today
+        ),
+        "sessions-held": ClassSession.objects.filter(unit=unit, date__gte=today),
+        "mark-semester-limit": AttendanceCounter.objects.filter(
+            student=student, unit=unit
+        ),
+        "my-units": Units.objects.filter(lecturer=lecturer)[:10],
+        "unit-by-code": Units.objects.filter(code=unit.code),
+        "student-by-regnumber": RegisteredStudents.objects.filter(
+            regnumber=student.regnumber
+        ),
+        "student-unit": RegisterUnits.objects.all()[:10],
+        "student-units-limit": RegisterUnits.objects.filter(student=student),
+        "unit-student": RegisterUnits.objects.filter(unit__lecturer=lecturer)[:10],
+        "attendance-list": student_attendance(attendance_records(weeks, lecturer)),
+        "attendance-list-days": student_attendance(
+            attendance_records(days, lecturer)
+        ),
+        "unit-attendance-list": unit_attendance(attendance_records(weeks, lecturer)),
+        "sessions-held-list": sessions_held(weeks, lecturer),
+        "attendance-export": export_rows(days, lecturer)[:2000],
+        "route-list": Route.objects.all()[:10],
+        "flight-list": Flight.objects.select_related("route")[:10],
+        "book-list": Book.objects.select_related("flight")[:10],
+        "book-list-cursor": Book.objects.order_by("created_at", "id")[:10],
+        "book-flight-date": Book.objects.filter(flight=flight, date=today),
+    }
+
+
+def sequential_scans(querysets: dict) -> dict:
+    """
+    The EXPLAIN output of the querysets that read their table with a
+    sequential scan, PostgreSQL only
+    """
+    scans = {}
+    for name, queryset in querysets.items():
+        plan = queryset.explain()
+        if f"Seq Scan on {queryset.model._meta.db_table}" in plan:
+            scans[name] = plan
+    return scans
+
+
+class Endpoint:
+    def __init__(self, name, method="get", kwargs=None, query=None, data=None):
+        self.name = name
+        self.method = method
+        self.kwargs = kwargs
+        self.query = query or {}
+        self.data = data
+
+    def call(self, client: Client, iteration: int):
+        path = reverse(self.name, kwargs=self.kwargs)
+        if self.method == "get":
+            return client.get(path, self.query)
+        data = self.data(iteration) if callable(self.data) else self.data
+        if self.query:
+            path = f"{path}?{urlencode(self.query)}"
+        return client.post(path, data, content_type="application/json")
+
+
+def benchmark_fixture(user, size: int = 20, days: int = 3):
+    """
+    Units of the benchmark user with size enrolled students and closed
+    sessions, so the lecturer endpoints have rows without touching the
+    existing units
+    """
+    tag = f"{FIXTURE_PREFIX}{uuid.uuid4().hex[:6]}"
+    today = timezone.localdate()
+    with transaction.atomic():
+        units = [
+            Units.objects.create(
+                code=f"{tag}-{n}", name=f"Benchmark unit {n}", lecturer=user
+            )
+            for n in range(UNITS_PER_STUDENT)
+        ]
+        students = [
+            RegisteredStudents.objects.create(
+                regnumber=f"{tag}/{n:04d}", sname=f"Benchmark student {n}"
+            )
+            for n in range(size)
+        ]
+        for unit in units:
+            for student in students:
+                RegisterUnits.objects.create(unit=unit, student=student)
+            for day in range(1, days + 1):
+                session = ClassSession.objects.create(
+                    unit=unit, date=today - timedelta(days=day)
+                )
+                for index, student in enumerate(students):
+                    MarkStudents.objects.create(
+                        unit=unit,
+                        student=student,
+                        session=session,
+                        status=index % 5 != 0,
+                    )
+                ClassSession.objects.close(session.id)
+
+
+def fixture_units(user):
+    return Units.objects.filter(lecturer=user, code__startswith=FIXTURE_PREFIX)
+
+
+def benchmark_user(password: str):
+    """
+    The staff account the benchmark runs as, its password is set for the run
+    """
+    user = User.objects.filter(email="benchmark@bench.test").first()
+    if user is None:
+        user = User.objects.create_user(
+            "benchmark",
+            "benchmark@bench.test",
+            password,
+            name="Benchmark",
+            is_staff=True,
+        )
+        Profile.objects.create(user=user)
+    else:
+        user.set_password(password)
+        user.save(update_fields=["password"])
+    if not fixture_units(user).exists():
+        benchmark_fixture(user)
+    return user
+
+
+def endpoints(user, password: str) -> list:
+    # the attendance is written to the benchmark user's own units only
+    units = fixture_units(user)
+    unit = units.first()
+    registrations = RegisterUnits.objects.filter(unit__in=units)
+    registration = registrations.first()
+    student = registration.student
+    route = Route.objects.first()
+    flight = Flight.objects.select_related("route").first()
+    book = Book.objects.first()
+    regnumbers = list(
+        RegisteredStudents.objects.filter(
+            pk__in=registrations.values("student")
+        ).values_list("regnumber", flat=True)
+    )
+    codes = list(units.values_list("code", flat=True))
+    tag = uuid.uuid4().hex[:6]
+    today = timezone.localdate()
+    # closing yesterday's session leaves today's open for the marks
+    session, _ = ClassSession.objects.get_or_create(
+        unit=unit, date=today - timedelta(days=1), slot=1
+    )
+
+    return [
+        Endpoint("login", "post", data={"email": user.email, "password": password}),
+        Endpoint(
+            "token_refresh",
+            "post",
+            data=lambda n: {"refresh": str(RefreshToken.for_user(user))},
+        ),
+        Endpoint(
+            "logout",
+            "post",
+            data=lambda n: {"refresh": str(RefreshToken.for_user(user))},
+        ),
+        Endpoint("token-tables"),
+        Endpoint(
+            "register",
+            "post",
+            data=lambda n: {
+                "username": f"{tag}r{n}",
+                "email": f"{tag}r{n}@bench.test",
+                "name": "Bench User",
+                "password": password,
+            },
+        ),
+        Endpoint(
+            "users-import",
+            "post",
+            data=lambda n: [
+                {
+                    "username": f"{tag}i{n}x{row}",
+                    "email": f"{tag}i{n}x{row}@bench.test",
+                    "name": "Imported User",
+                    "password": password,
+                }
+                for row in range(20)
+            ],
+        ),
+        Endpoint("me-detail", kwargs={"id": user.id}),
+        Endpoint("profile", kwargs={"user": user.id}),
+        Endpoint("users"),
+        Endpoint("profiles"),
+        Endpoint("units-list"),
+        Endpoint("units-detail", kwargs={"id": unit.id}),
+        Endpoint("student-list"),
+        Endpoint("student-detail", kwargs={"id": student.id}),
+        Endpoint(
+            "student-import",
+            "post",
+            query={"dry_run": "true"},
+            data=[
+                {"regnumber": f"{tag}/{n:06d}", "sname": "Imported"}
+                for n in range(100)
+            ],
+        ),
+        Endpoint("student-unit"),
+        Endpoint("studentunit-detail", kwargs={"id": registration.id}),
+        Endpoint("my-units"),
+        Endpoint("unit-student"),
+        Endpoint("my-roster"),
+        Endpoint("my-roster-async"),
+        Endpoint("session-list"),
+        Endpoint("session-close", "post", kwargs={"id": session.id}),
+        Endpoint("marked-detail"),
+        Endpoint("marked-detail", query={"pagination": "cursor"}),
+        Endpoint("attendance-list"),
+        Endpoint("attendance-list-async"),
+        Endpoint("unit-attendance-list"),
+        Endpoint("unit-attendance-list-async"),
+        Endpoint("attendance-export", query={"unit": unit.code}),
+        Endpoint("attendance-export-async", query={"unit": unit.code}),
+        Endpoint("mark-list"),
+        Endpoint(
+            "mark-list",
+            "post",
+            data=lambda n: {
+                "student": regnumbers[n % len(regnumbers)],
+                "unit": codes[n % len(codes)],
+            },
+        ),
+        Endpoint(
+            "mark-bulk",
+            "post",
+            data=lambda n: {
+                "unit": codes[n % len(codes)],
+                "marks": [{"student": regnumber} for regnumber in regnumbers[:50]],
+            },
+        ),
+        Endpoint("route-list"),
+        Endpoint("route-detail", kwargs={"id": route.id}),
+        Endpoint("flight-list"),
+        Endpoint("flight-detail", kwargs={"id": flight.id}),
+        Endpoint("featured-flight"),
+        *(
+            Endpoint(
+                name,
+                query={
+                    "origin": flight.route.start,
+                    "destination": flight.route.end,
+                    "date_from": today,
+                    "date_to": today + timedelta(days=6),
+                },
+            )
+            for name in ("flight-search", "flight-search-async")
+        ),
+        Endpoint(
+            "book-create",
+            "post",
+            data=lambda n: {
+                "name": "Bench Passenger",
+                "contact": 711000000 + n,
+                "email": f"{tag}b{n}@bench.test",
+                "flight": flight.name,
+                "date": (today + timedelta(days=n % 30)).isoformat(),
+            },
+        ),
+        Endpoint("book-list"),
+        Endpoint("book-detail", kwargs={"id": book.id}),
+    ]
+
+
+def percentile(values: list, percent: float) -> float:
+    ordered = sorted(values)
+    index = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+def summarize(endpoint: Endpoint, timings: list, statuses: dict) -> dict:
+    return {
+        "method": endpoint.method.upper(),
+        "path": reverse(endpoint.name, kwargs=endpoint.kwargs),
+        "query": {key: str(value) for key, value in endpoint.query.items()},
+        "requests": len(timings),
+        "statuses": {str(code): count for code, count in statuses.items()},
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p90_ms": round(percentile(timings, 90), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+    }
+
+
+async def drain(content):
+    async for _ in content:
+        pass
+
+
+def consume(response):
+    if response.streaming and response.is_async:
+        async_to_sync(drain)(response.streaming_content)
+    elif response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(endpoint: Endpoint, client: Client, repeat: int) -> dict:
+    """
+    Times repeat calls, then makes one more untimed call under tracemalloc
+    for the peak allocation of a request, tracing would slow the timed ones
+    """
+    timings, queries, statuses = [], [], {}
+    for iteration in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = consume(endpoint.call(client, iteration))
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured))
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    tracemalloc.start()
+    try:
+        consume(endpoint.call(client, repeat))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        **summarize(endpoint, timings, statuses),
+        "queries": max(queries),
+        "peak_alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def fetch(url: str, token: str) -> tuple:
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    return (time.perf_counter() - start) * 1000, status
+
+
+def measure_http(
+    endpoint: Endpoint, base_url: str, token: str, repeat: int, concurrency: int
+) -> dict:
+    """
+    Sends repeat requests to a running server, concurrency at a time, so a
+    WSGI and an ASGI deployment can be compared under the same load
+    """
+    url = base_url.rstrip("/") + reverse(endpoint.name, kwargs=endpoint.kwargs)
+    if endpoint.query:
+        url = f"{url}?{urlencode(endpoint.query)}"
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(lambda _: fetch(url, token), range(repeat)))
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        **summarize(endpoint, [timing for timing, _ in results], statuses),
+        "concurrency": concurrency,
+        "requests_per_second": round(repeat / elapsed, 1),
+        "queries": None,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(repeat: int = 20, only=None, base_url=None, concurrency: int = 1) -> dict:
+    """
+    Benchmarks the endpoints through the test client, or over HTTP against
+    base_url where only the GET endpoints are sent
+    """
+    password = random_password()
+    user = benchmark_user(password)
+    access = RefreshToken.for_user(user).access_token
+    client = Client(SERVER_NAME="localhost", HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    results = {}
+    for endpoint in endpoints(user, password):
+        key = endpoint.name
+        if endpoint.method != "get":
+            key = f"{key} {endpoint.method.upper()}"
+        if endpoint.query:
+            key = f"{key} ?{'&'.join(endpoint.query)}"
+        if only and endpoint.name not in only:
+            continue
+        if base_url is None:
+            results[key] = measure(endpoint, client, repeat)
+        elif endpoint.method == "get":
+            results[key] = measure_http(
+                endpoint, base_url, str(access), repeat, concurrency
+            )
+
+    return {
+        "revision": git_revision(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "database": connection.vendor,
+        "server": base_url or "test client",
+        "rows": {
+            "marks": MarkStudents.objects.count(),
+            "students": RegisteredStudents.objects.count(),
+            "bookings": Book.objects.count(),
+        },
+        "endpoints": results,
+    }
+
+
+def compare(before: dict, after: dict) -> list:
+    """
+    Lines comparing the p50 latency and query counts of two reports
+    """
+    lines = []
+    for key, new in after["endpoints"].items():
+        old = before["endpoints"].get(key)
+        if old is None:
+            continue
+        change = 0
+        if old["p50_ms"]:
+            change = (new["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+        lines.append(
+            f"{key:45} p50 {old['p50_ms']:9.2f} -> {new['p50_ms']:9.2f} ms "
+            f"({change:+.0f}%)  queries {old['queries']} -> {new['queries']}"
+        )
+    return lines
@@ -0,0 +1,89 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django_filters import rest_framework as filters
+
+from users.models import ClassSession, MarkStudents, AttendanceSummary, week_of
+
+
+def start_of_day(value):
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+class AttendanceFilter(filters.FilterSet):
+    """
+    Filters marks by unit code, lecturer username and the date they were taken
+    The dates are turned into created_at ranges so the indexes can be used
+    """
+
+    unit = filters.CharFilter(field_name="unit__code")
+    lecturer = filters.CharFilter(field_name="unit__lecturer__username")
+    start = filters.DateFilter(method="filter_start")
+    end = filters.DateFilter(method="filter_end")
+
+    class Meta:
+        model = MarkStudents
+        fields = ["unit", "lecturer", "start", "end"]
+
+    def filter_start(self, queryset, name, value):
+        return queryset.filter(created_at__gte=start_of_day(value))
+
+    def filter_end(self, queryset, name, value):
+        return queryset.filter(created_at__lt=start_of_day(value + timedelta(days=1)))
+
+
+class SessionAttendanceFilter(AttendanceFilter):
+    """
+    AttendanceFilter on the date of the session a mark belongs to, the days
+    the weekly summaries are grouped by
+    """
+
+    def filter_start(self, queryset, name, value):
+        return queryset.filter(session__date__gte=value)
+
+    def filter_end(self, queryset, name, value):
+        return queryset.filter(session__date__lte=value)
+
+
+class AttendanceSummaryFilter(filters.FilterSet):
+    """
+    Same filters as AttendanceFilter for the weekly summaries, the dates
+    select the whole weeks they fall in so a range has to start on a Monday
+    and end on a Sunday to be exact
+    """
+
+    unit = filters.CharFilter(field_name="unit__code")
+    lecturer = filters.CharFilter(field_name="unit__lecturer__username")
+    start = filters.DateFilter(method="filter_start")
+    end = filters.DateFilter(method="filter_end")
+
+    class Meta:
+        model = AttendanceSummary
+        fields = ["unit", "lecturer", "start", "end"]
+
+    def filter_start(self, queryset, name, value):
+        return queryset.filter(week__gte=week_of(start_of_day(value)))
+
+    def filter_end(self, queryset, name, value):
+        return queryset.filter(week__lte=week_of(start_of_day(value)))
+
+
+class ClassSessionFilter(filters.FilterSet):
+    """
+    Same filters for the class sessions, on the date they were held
+    """
+
+    unit = filters.CharFilter(field_name="unit__code")
+    lecturer = filters.CharFilter(field_name="unit__lecturer__username")
+    start = filters.DateFilter(method="filter_start")
+    end = filters.DateFilter(method="filter_end")
+
+    class Meta:
+        model = ClassSession
+        fields = ["unit", "lecturer", "start", "end"]
+
+    def filter_start(self, queryset, name, value):
+        return queryset.filter(date__gte=value)
+
+    def filter_end(self, queryset, name, value):
+        return queryset.filter(date__lte=value)
@@ -0,0 +1,348 @@
+"""
+Bulk imports of students, unit registrations and user accounts
+
+Rows are checked as sets, a handful of queries for the whole file, and
+inserted with bulk_create one chunk per transaction. Rows that fail are
+reported back with their index and do not stop the others.
+"""
+import csv
+import io
+import multiprocessing
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from users.abstracts import violated_constraint
+from users.models import Profile, RegisteredStudents, RegisterUnits, Units
+from users.roster import forget_rosters
+from users.validators import (
+    validate_password_digit,
+    validate_password_lowercase,
+    validate_password_symbol,
+    validate_password_uppercase,
+)
+
+CHUNK_SIZE = 1000
+FAILED = "Row could not be saved, try again"
+EXISTING_STUDENT = "Student with this regnumber already exists"
+EXISTING_REGISTRATION = "Student has already registered this unit"
+MAX_UNITS = "Student has reached maximum units"
+HASH_CHUNK_SIZE = 50
+
+User = get_user_model()
+
+
+class StudentRowSerializer(serializers.Serializer):
+    regnumber = serializers.CharField(max_length=30, min_length=2)
+    sname = serializers.CharField(max_length=200, min_length=2)
+
+
+class RegistrationRowSerializer(serializers.Serializer):
+    student = serializers.CharField(max_length=30)
+    unit = serializers.CharField(max_length=20)
+
+
+class UserRowSerializer(serializers.Serializer):
+    """
+    The fields of UserSerializer, uniqueness is checked for all rows at once
+    """
+
+    username = serializers.CharField(max_length=20, min_length=4)
+    email = serializers.EmailField()
+    name = serializers.CharField(max_length=50, min_length=4)
+    password = serializers.CharField(
+        max_length=128,
+        min_length=5,
+        validators=[
+            validate_password_digit,
+            validate_password_uppercase,
+            validate_password_symbol,
+            validate_password_lowercase,
+        ],
+    )
+    is_staff = serializers.BooleanField(default=False)
+
+
+def read_rows(request) -> list:
+    """
+    Rows from an uploaded CSV file, a JSON list or a JSON object with rows
+    """
+    upload = request.FILES.get("file")
+    if upload:
+        text = io.TextIOWrapper(upload.file, encoding="utf-8-sig")
+        return list(csv.DictReader(text))
+    if isinstance(request.data, list):
+        return request.data
+    return request.data.get("rows", [])
+
+
+def validate_rows(rows: list, serializer_class, errors: list) -> dict:
+    valid = {}
+    for index, row in enumerate(rows):
+        serializer = serializer_class(data=row)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+    return valid
+
+
+def insert_chunk(model, objects: dict, errors: list, error: dict) -> int:
+    """
+    Inserts the objects, keyed by their row index, skipping the ones that
+    clash with rows written since they were checked, those are reported
+    with error
+    """
+    model.objects.bulk_create(objects.values(), ignore_conflicts=True)
+    inserted = set(
+        model.objects.filter(pk__in=[obj.pk for obj in objects.values()]).values_list(
+            "pk", flat=True
+        )
+    )
+    for index, obj in objects.items():
+        if obj.pk not in inserted:
+            errors.append({"index": index, "errors": error})
+    return len(inserted)
+
+
+def chunks(objects: dict):
+    indexes = list(objects)
+    for start in range(0, len(indexes), CHUNK_SIZE):
+        yield {index: objects[index] for index in indexes[start:start + CHUNK_SIZE]}
+
+
+def bulk_insert(model, objects: dict, errors: list, error: dict) -> int:
+    """
+    Inserts the objects one chunk per transaction, a chunk that still fails
+    is reported row by row and does not undo the chunks before it
+    """
+    created = 0
+    for chunk in chunks(objects):
+        try:
+            with transaction.atomic():
+                created += insert_chunk(model, chunk, errors, error)
+        except IntegrityError:
+            errors.extend(
+                {"index": index, "errors": {"non_field_errors": [FAILED]}}
+                for index in chunk
+            )
+    return created
+
+
+def import_students(rows: list, dry_run: bool = False) -> dict:
+    errors = []
+    valid = validate_rows(rows, StudentRowSerializer, errors)
+
+    existing = set(
+        RegisteredStudents.objects.filter(
+            regnumber__in={row["regnumber"] for row in valid.values()}
+        ).values_list("regnumber", flat=True)
+    )
+    students, regnumbers = {}, set()
+    for index, row in valid.items():
+        if row["regnumber"] in existing:
+            error = EXISTING_STUDENT
+        elif row["regnumber"] in regnumbers:
+            error = "Regnumber appears more than once"
+        else:
+            regnumbers.add(row["regnumber"])
+            students[index] = RegisteredStudents(**row)
+            continue
+        errors.append({"index": index, "errors": {"regnumber": [error]}})
+
+    created = len(students)
+    if not dry_run:
+        created = bulk_insert(
+            RegisteredStudents, students, errors, {"regnumber": [EXISTING_STUDENT]}
+        )
+    errors.sort(key=lambda error: error["index"])
+    return {"created": created, "errors": errors, "dry_run": dry_run}
+
+
+def insert_registrations(registrations: dict, errors: list) -> int:
+    """
+    Inserts the registrations one chunk per transaction
+    The rows of the chunk's students are locked first, the same rows
+    RegisterUnits.save takes a slot on, so the duplicates and the unit
+    limit are checked again and units_count refreshed before any other
+    registration of those students can land.
+    """
+    created, limit = 0, RegisterUnits.objects.max_units
+    for chunk in chunks(registrations):
+        students = {registration.student_id for registration in chunk.values()}
+        inserted, rejected = 0, []
+        try:
+            with transaction.atomic():
+                list(
+                    RegisteredStudents.objects.select_for_update()
+                    .filter(pk__in=students)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)
+                )
+                enrolled = list(
+                    RegisterUnits.objects.filter(student__in=students).values_list(
+                        "student", "unit"
+                    )
+                )
+                pairs = set(enrolled)
+                counts = Counter(student for student, _ in enrolled)
+                accepted = {}
+                for index, registration in chunk.items():
+                    pair = (registration.student_id, registration.unit_id)
+                    if pair in pairs:
+                        error = {"unit": [EXISTING_REGISTRATION]}
+                    elif counts[registration.student_id] >= limit:
+                        error = {"student": [MAX_UNITS]}
+                    else:
+                        pairs.add(pair)
+                        counts[registration.student_id] += 1
+                        accepted[index] = registration
+                        continue
+                    rejected.append({"index": index, "errors": error})
+
+                inserted = insert_chunk(
+                    RegisterUnits, accepted, rejected, {"unit": [EXISTING_REGISTRATION]}
+                )
+                # bulk_create skips the signals that keep units_count in step
+                RegisterUnits.objects.refresh_counts(students)
+        except IntegrityError:
+            inserted, rejected = 0, [
+                {"index": index, "errors": {"non_field_errors": [FAILED]}}
+                for index in chunk
+            ]
+        created += inserted
+        errors.extend(rejected)
+    return created
+
+
+def import_registrations(rows: list, dry_run: bool = False) -> dict:
+    errors = []
+    valid = validate_rows(rows, RegistrationRowSerializer, errors)
+
+    students = dict(
+        RegisteredStudents.objects.filter(
+            regnumber__in={row["student"] for row in valid.values()}
+        ).values_list("regnumber", "id")
+    )
+    units = dict(
+        Units.objects.filter(
+            code__in={row["unit"] for row in valid.values()}
+        ).values_list("code", "id")
+    )
+    # a student holds at most a few units, the pairs give both the
+    # duplicates and the units per student in one query
+    enrolled = list(
+        RegisterUnits.objects.filter(student__in=students.values()).values_list(
+            "student", "unit"
+        )
+    )
+    pairs = set(enrolled)
+    counts = Counter(student for student, _ in enrolled)
+
+    registrations = {}
+    for index, row in valid.items():
+        student, unit = students.get(row["student"]), units.get(row["unit"])
+        if student is None:
+            error = {"student": ["Student does not exist"]}
+        elif unit is None:
+            error = {"unit": ["Unit does not exist"]}
+        elif (student, unit) in pairs:
+            error = {"unit": [EXISTING_REGISTRATION]}
+        elif counts[student] >= RegisterUnits.objects.max_units:
+            error = {"student": [MAX_UNITS]}
+        else:
+            pairs.add((student, unit))
+            counts[student] += 1
+            registrations[index] = RegisterUnits(student_id=student, unit_id=unit)
+            continue
+        errors.append({"index": index, "errors": error})
+
+    created = len(registrations)
+    if not dry_run:
+        created = insert_registrations(registrations, errors)
+        forget_rosters(
+            Units.objects.filter(
+                pk__in={registration.unit_id for registration in registrations.values()}
+            ).values_list("lecturer_id", flat=True)
+        )
+    errors.sort(key=lambda error: error["index"])
+    return {"created": created, "errors": errors, "dry_run": dry_run}
+
+
+def hash_passwords(passwords: list, workers=None) -> list:
+    """
+    The passwords hashed in parallel by a pool of forked processes, or in
+    this process when workers is 1. Only the provision_users command forks,
+    a fork taken in a threaded web worker can inherit a held lock and hang.
+    """
+    if len(passwords) <= HASH_CHUNK_SIZE or workers == 1:
+        return [make_password(password) for password in passwords]
+    # forked workers inherit the configured settings and their hasher
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(workers, mp_context=context) as executor:
+        return list(executor.map(make_password, passwords, chunksize=HASH_CHUNK_SIZE))
+
+
+def import_users(rows: list, dry_run: bool = False, workers: int = 1) -> dict:
+    start = time.perf_counter()
+    errors = []
+    valid = validate_rows(rows, UserRowSerializer, errors)
+    for row in valid.values():
+        row["email"] = User.objects.normalize_email(row["email"])
+
+    emails = set(
+        User.objects.filter(
+            email__in={row["email"] for row in valid.values()}
+        ).values_list("email", flat=True)
+    )
+    usernames = set(
+        User.objects.filter(
+            username__in={row["username"] for row in valid.values()}
+        ).values_list("username", flat=True)
+    )
+    accepted = []
+    for index, row in valid.items():
+        if row["email"] in emails:
+            error = {"email": ["user with this email already exists."]}
+        elif row["username"] in usernames:
+            error = {"username": ["user with this username already exists."]}
+        else:
+            emails.add(row["email"])
+            usernames.add(row["username"])
+            accepted.append(row)
+            continue
+        errors.append({"index": index, "errors": error})
+
+    if not dry_run and accepted:
+        passwords = hash_passwords([row.pop("password") for row in accepted], workers)
+        users = [
+            User(password=password, **row)
+            for row, password in zip(accepted, passwords)
+        ]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=CHUNK_SIZE)
+                Profile.objects.bulk_create(
+                    [Profile(user=user) for user in users], batch_size=CHUNK_SIZE
+                )
+        except IntegrityError as error:
+            if violated_constraint(error, User) not in ("email", "username"):
+                raise
+            raise serializers.ValidationError(
+                "Accounts were created with the same email or username meanwhile, "
+                "none were imported"
+            )
+
+    seconds = time.perf_counter() - start
+    return {
+        "created": len(accepted),
+        "errors": errors,
+        "dry_run": dry_run,
+        "seconds": round(seconds, 3),
+        "users_per_second": round(len(accepted) / seconds, 1) if seconds else None,
+    }
@@ -0,0 +1,69 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from users.benchmark import DISPOSABLE_FLAG, check_disposable, compare, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Times every API endpoint through the test client, or the GET endpoints "
+        "of a running server, and writes latency percentiles, query counts and "
+        "memory to a JSON report"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            dest="endpoints",
+            help="URL name to benchmark, can be repeated, defaults to all",
+        )
+        parser.add_argument("--output", default="benchmark.json")
+        parser.add_argument(
+            "--compare", help="Report of an earlier run to compare against"
+        )
+        parser.add_argument(
+            "--base-url",
+            help="Send the requests to a running server, e.g. http://localhost:8000",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Requests in flight at once when a base url is given",
+        )
+        parser.add_argument(
+            DISPOSABLE_FLAG,
+            action="store_true",
+            dest="disposable",
+            help="Run with DEBUG off, the rows written are not removed",
+        )
+
+    def handle(self, *args, **options):
+        check_disposable(options["disposable"])
+        report = run(
+            options["repeat"],
+            options["endpoints"],
+            options["base_url"],
+            options["concurrency"],
+        )
+        with open(options["output"], "w") as output:
+            json.dump(report, output, indent=2)
+
+        for name, result in report["endpoints"].items():
+            self.stdout.write(
+                f"{name:45} p50 {result['p50_ms']:9.2f} ms  "
+                f"p99 {result['p99_ms']:9.2f} ms  queries {result['queries']}"
+                + (
+                    f"  {result['requests_per_second']:8.1f} req/s"
+                    if "requests_per_second" in result
+                    else ""
+                )
+            )
+        if options["compare"]:
+            with open(options["compare"]) as before:
+                for line in compare(json.load(before), report):
+                    self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
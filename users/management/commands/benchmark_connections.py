@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+from users.benchmark import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a one query request cycle with a new connection per request and "
+        "with a persistent connection and reports the latency percentiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--conn-max-age", type=int, default=600)
+
+    def cycle(self, requests: int, conn_max_age: int) -> list:
+        connection.close()
+        connection.settings_dict["CONN_MAX_AGE"] = conn_max_age
+        connection.settings_dict["CONN_HEALTH_CHECKS"] = conn_max_age != 0
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            # the signals close or keep the connection as a request would
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - start) * 1000)
+        connection.close()
+        return timings
+
+    def handle(self, *args, **options):
+        settings = dict(connection.settings_dict)
+        try:
+            for name, conn_max_age in (
+                ("connection per request", 0),
+                ("persistent connection", options["conn_max_age"]),
+            ):
+                timings = self.cycle(options["requests"], conn_max_age)
+                self.stdout.write(
+                    f"{name:24} p50 {percentile(timings, 50):8.2f} ms  "
+                    f"p99 {percentile(timings, 99):8.2f} ms"
+                )
+        finally:
+            connection.settings_dict.update(settings)
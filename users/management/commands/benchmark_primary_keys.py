@@ -0,0 +1,71 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from users.abstracts import uuid7
+
+SCHEMES = {
+    "uuid4": uuid.uuid4,
+    "uuid7": uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Inserts the same number of rows into temporary tables keyed by random "
+        "and by time ordered uuids and reports the insert throughput and the "
+        "size of the tables and their primary key indexes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200000)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def insert(self, cursor, table, make_id, rows, batch_size) -> float:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {table} "
+            "(id uuid PRIMARY KEY, created_at timestamp with time zone NOT NULL)"
+        )
+        start = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            size = min(batch_size, rows - offset)
+            now = timezone.now()
+            params = []
+            for _ in range(size):
+                params.extend([make_id(), now])
+            cursor.execute(
+                f"INSERT INTO {table} (id, created_at) VALUES "
+                + ", ".join(["(%s, %s)"] * size),
+                params,
+            )
+        return time.perf_counter() - start
+
+    def sizes(self, cursor, table) -> tuple:
+        cursor.execute(
+            "SELECT pg_relation_size(%s), pg_relation_size(%s)",
+            [table, f"{table}_pkey"],
+        )
+        return cursor.fetchone()
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The primary key benchmark runs on PostgreSQL")
+
+        rows = options["rows"]
+        with connection.cursor() as cursor:
+            for name, make_id in SCHEMES.items():
+                table = f"benchmark_{name}"
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                seconds = self.insert(
+                    cursor, table, make_id, rows, options["batch_size"]
+                )
+                table_size, index_size = self.sizes(cursor, table)
+                cursor.execute(f"DROP TABLE {table}")
+                self.stdout.write(
+                    f"{name}: {rows / seconds:10.0f} rows/s  "
+                    f"table {table_size / 1048576:7.1f} MB  "
+                    f"primary key {index_size / 1048576:7.1f} MB"
+                )
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from flights.models import Flight
+from users.benchmark import hot_querysets, sequential_scans
+from users.models import RegisteredStudents, Units
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs EXPLAIN on the querysets behind the API and fails if any of them "
+        "reads its table with a sequential scan. Run it against a seeded database, "
+        "on small tables the planner prefers sequential scans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print the full plan of every queryset",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Query plans can only be checked on PostgreSQL")
+
+        lecturer = User.objects.filter(units__isnull=False).first()
+        unit = Units.objects.first()
+        student = RegisteredStudents.objects.first()
+        flight = Flight.objects.first()
+        if not (lecturer and unit and student and flight):
+            raise CommandError("Seed the database before checking the query plans")
+
+        querysets = hot_querysets(lecturer, unit, student, flight)
+        if options["verbose_plans"]:
+            for name, queryset in querysets.items():
+                self.stdout.write(f"{name}:\n{queryset.explain()}\n")
+        failures = sequential_scans(querysets)
+        for name in failures:
+            table = querysets[name].model._meta.db_table
+            self.stderr.write(f"{name}: Seq Scan on {table}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} querysets use a sequential scan")
+        self.stdout.write(self.style.SUCCESS("No sequential scans on the API tables"))
@@ -0,0 +1,38 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from users.imports import import_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the accounts of a CSV file with username, email, name, "
+        "password and is_staff columns, hashing the passwords in parallel"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file")
+        parser.add_argument(
+            "--workers", type=int, help="Hashing processes, defaults to the cpus"
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        with open(options["file"], newline="", encoding="utf-8-sig") as file:
+            rows = list(csv.DictReader(file))
+        try:
+            result = import_users(rows, options["dry_run"], options["workers"])
+        except ValidationError as error:
+            raise CommandError(error.detail)
+
+        for error in result["errors"]:
+            self.stderr.write(f"row {error['index']}: {error['errors']}")
+        verb = "Would create" if result["dry_run"] else "Created"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {result['created']} accounts in {result['seconds']} s "
+                f"({result['users_per_second']} accounts/s)"
+            )
+        )
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.tokens import purge_expired, token_tables
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired blacklisted and outstanding tokens in batches, "
+        "every --interval seconds when given, and reports the table sizes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Seconds between purges, runs once when 0",
+        )
+
+    def purge(self, batch_size: int):
+        purged = purge_expired(batch_size)
+        self.stdout.write(
+            f"Purged {purged['blacklisted']} blacklisted and "
+            f"{purged['outstanding']} outstanding tokens"
+        )
+        for name, table in token_tables().items():
+            line = f"{name}: {table['rows']} rows"
+            if table["bytes"] is not None:
+                line += f"  {table['bytes'] / 1048576:.1f} MB"
+            self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        while True:
+            self.purge(options["batch_size"])
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
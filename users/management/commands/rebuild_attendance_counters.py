@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import AttendanceCounter
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the attendance counters from the marks and checks them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare the counters with the marks, without rebuilding",
+        )
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            created = AttendanceCounter.objects.rebuild()
+            self.stdout.write(f"Rebuilt {created} attendance counters")
+
+        mismatches = AttendanceCounter.objects.mismatches()
+        for unit_id, student_id, expected, actual in mismatches:
+            self.stderr.write(
+                f"unit={unit_id} student={student_id or '-'} "
+                f"expected={expected} actual={actual}"
+            )
+        if mismatches:
+            raise CommandError(
+                f"{len(mismatches)} attendance counters do not match the marks"
+            )
+        self.stdout.write(self.style.SUCCESS("Attendance counters match the marks"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from users.models import AttendanceSummary
+
+
+class Command(BaseCommand):
+    help = "Recomputes the weekly attendance summaries from the marks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=50,
+            help="Number of units rebuilt per transaction",
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = AttendanceSummary.objects.rebuild(options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rebuilt} weekly attendance summaries")
+        )
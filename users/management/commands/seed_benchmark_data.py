@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.benchmark import DISPOSABLE_FLAG, check_disposable, plan, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with generated users, units, students, enrolments, "
+        "marks, routes, flights and bookings for the benchmarks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=10000,
+            help="Number of marks, the other tables are sized from it",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+        parser.add_argument(
+            DISPOSABLE_FLAG,
+            action="store_true",
+            dest="disposable",
+            help="Run with DEBUG off, the rows written are not removed",
+        )
+
+    def handle(self, *args, **options):
+        check_disposable(options["disposable"])
+        self.stdout.write(f"Seeding {plan(options['scale'])}")
+        start = time.perf_counter()
+        counts = seed(options["scale"], options["seed"])
+        for table, count in counts.items():
+            self.stdout.write(f"{table:12} {count}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Seeded in {time.perf_counter() - start:.1f}s")
+        )
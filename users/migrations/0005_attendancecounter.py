@@ -0,0 +1,87 @@
+# Generated by Django 4.1.3 on 2026-10-18 09:12
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+import uuid
+
+
+def build_counters(apps, schema_editor):
+    MarkStudents = apps.get_model("users", "MarkStudents")
+    AttendanceCounter = apps.get_model("users", "AttendanceCounter")
+
+    marks = MarkStudents.objects.filter(status=True).order_by()
+    counters = [
+        AttendanceCounter(
+            unit_id=row["unit_id"],
+            student_id=row["student_id"],
+            present=row["present"],
+        )
+        for row in marks.values("unit_id", "student_id").annotate(present=Count("id"))
+    ]
+    counters += [
+        AttendanceCounter(unit_id=row["unit_id"], present=row["present"])
+        for row in marks.values("unit_id").annotate(present=Count("id"))
+    ]
+    AttendanceCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_alter_markstudents_total"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttendanceCounter",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("present", models.PositiveIntegerField(default=0)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="users.registeredstudents",
+                    ),
+                ),
+                (
+                    "unit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="users.units"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["unit", "student"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="attendancecounter",
+            constraint=models.UniqueConstraint(
+                fields=("unit", "student"), name="unique_student_unit_counter"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="attendancecounter",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("student__isnull", True)),
+                fields=("unit",),
+                name="unique_unit_counter",
+            ),
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
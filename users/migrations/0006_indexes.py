@@ -0,0 +1,129 @@
+# Generated by Django 4.1.3 on 2026-10-18 10:03
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicates(apps, schema_editor):
+    """
+    Folds the students sharing a regnumber and the units sharing a code into
+    the first one created, their registrations and marks move with them
+    """
+    RegisteredStudents = apps.get_model("users", "RegisteredStudents")
+    Units = apps.get_model("users", "Units")
+    RegisterUnits = apps.get_model("users", "RegisterUnits")
+    MarkStudents = apps.get_model("users", "MarkStudents")
+    AttendanceCounter = apps.get_model("users", "AttendanceCounter")
+
+    merged = False
+    for model, field, relation in (
+        (RegisteredStudents, "regnumber", "student_id"),
+        (Units, "code", "unit_id"),
+    ):
+        duplicates = (
+            model.objects.values(field)
+            .annotate(count=Count("id"))
+            .filter(count__gt=1)
+            .order_by()
+        )
+        for row in duplicates:
+            keep, *others = (
+                model.objects.filter(**{field: row[field]})
+                .order_by("created_at", "id")
+                .values_list("id", flat=True)
+            )
+            # registrations and marks that now repeat are removed by 0010
+            # and 0011
+            for related in (RegisterUnits, MarkStudents):
+                related.objects.filter(**{f"{relation}__in": others}).update(
+                    **{relation: keep}
+                )
+            model.objects.filter(id__in=others).delete()
+            merged = True
+    if not merged:
+        return
+    if schema_editor.connection.vendor == "postgresql":
+        # runs the deferred foreign key checks of the moved rows now, the
+        # tables can not be altered while they are pending
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        schema_editor.execute("SET CONSTRAINTS ALL DEFERRED")
+
+    # the counters of the merged rows are counted again
+    AttendanceCounter.objects.all().delete()
+    marks = MarkStudents.objects.filter(status=True).order_by()
+    counters = [
+        AttendanceCounter(
+            unit_id=row["unit_id"],
+            student_id=row["student_id"],
+            present=row["present"],
+        )
+        for row in marks.values("unit_id", "student_id").annotate(present=Count("id"))
+    ]
+    counters += [
+        AttendanceCounter(unit_id=row["unit_id"], present=row["present"])
+        for row in marks.values("unit_id").annotate(present=Count("id"))
+    ]
+    AttendanceCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_attendancecounter"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="registeredstudents",
+            name="regnumber",
+            field=models.CharField(max_length=30, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="units",
+            name="code",
+            field=models.CharField(max_length=20, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name="units",
+            index=models.Index(
+                fields=["lecturer", "created_at"], name="unit_lecturer_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="registerunits",
+            index=models.Index(
+                fields=["student", "unit"], name="registration_student_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="registerunits",
+            index=models.Index(
+                fields=["created_at", "unit"], name="registration_ordering_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="markstudents",
+            index=models.Index(
+                fields=["student", "unit", "status"], name="mark_student_unit_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="markstudents",
+            index=models.Index(fields=["unit", "created_at"], name="mark_unit_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="markstudents",
+            index=models.Index(
+                fields=["created_at", "student", "status"], name="mark_ordering_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="markstudents",
+            index=models.Index(
+                condition=models.Q(("status", True)),
+                fields=["unit", "student"],
+                name="mark_present_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.1.3 on 2026-10-18 11:26
+
+from django.db import migrations, models
+from django.db.models import Count, DateField, Q
+from django.db.models.functions import TruncWeek
+import django.db.models.deletion
+import uuid
+
+
+def build_summaries(apps, schema_editor):
+    MarkStudents = apps.get_model("users", "MarkStudents")
+    AttendanceSummary = apps.get_model("users", "AttendanceSummary")
+
+    rows = (
+        MarkStudents.objects.annotate(
+            week=TruncWeek("created_at", output_field=DateField())
+        )
+        .values("unit_id", "student_id", "week")
+        .annotate(
+            present=Count("id", filter=Q(status=True)),
+            absent=Count("id", filter=Q(status=False)),
+        )
+        .order_by()
+    )
+    AttendanceSummary.objects.bulk_create(
+        [AttendanceSummary(**row) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0006_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttendanceSummary",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("week", models.DateField()),
+                ("present", models.PositiveIntegerField(default=0)),
+                ("absent", models.PositiveIntegerField(default=0)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="users.registeredstudents",
+                    ),
+                ),
+                (
+                    "unit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="users.units"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["unit", "student", "week"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="attendancesummary",
+            index=models.Index(fields=["unit", "week"], name="summary_unit_week_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="attendancesummary",
+            constraint=models.UniqueConstraint(
+                fields=("student", "unit", "week"), name="unique_attendance_summary"
+            ),
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.3 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0007_attendancesummary"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="registerunits",
+            index=models.Index(
+                fields=["created_at", "id"], name="registration_cursor_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="markstudents",
+            index=models.Index(fields=["created_at", "id"], name="mark_cursor_idx"),
+        ),
+    ]
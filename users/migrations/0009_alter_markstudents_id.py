@@ -0,0 +1,26 @@
+# Generated by Django 4.1.3 on 2026-10-18 15:20
+
+from django.db import migrations, models
+import users.abstracts
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0008_cursor_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="markstudents",
+            name="id",
+            field=models.UUIDField(
+                default=users.abstracts.uuid7,
+                editable=False,
+                max_length=255,
+                primary_key=True,
+                serialize=False,
+                unique=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_registrations(apps, schema_editor):
+    RegisterUnits = apps.get_model("users", "RegisterUnits")
+
+    duplicates = (
+        RegisterUnits.objects.values("student_id", "unit_id")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        registrations = RegisterUnits.objects.filter(
+            student_id=row["student_id"], unit_id=row["unit_id"]
+        ).order_by("created_at", "id")
+        keep = registrations.values_list("id", flat=True).first()
+        registrations.exclude(id=keep).delete()
+
+
+def count_units(apps, schema_editor):
+    RegisteredStudents = apps.get_model("users", "RegisteredStudents")
+    RegisterUnits = apps.get_model("users", "RegisterUnits")
+
+    units = (
+        RegisterUnits.objects.filter(student=OuterRef("pk"))
+        .order_by()
+        .values("student")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    RegisteredStudents.objects.update(units_count=Coalesce(Subquery(units), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0009_alter_markstudents_id"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_registrations, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="registerunits",
+            name="registration_student_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="registerunits",
+            constraint=models.UniqueConstraint(
+                fields=("student", "unit"), name="unique_student_unit"
+            ),
+        ),
+        migrations.AddField(
+            model_name="registeredstudents",
+            name="units_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_units, migrations.RunPython.noop),
+    ]
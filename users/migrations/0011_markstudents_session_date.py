@@ -0,0 +1,80 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:40
+
+from django.db import migrations, models
+from django.db.models import Count, DateField, Q
+from django.db.models.functions import TruncDate, TruncWeek
+
+
+def fill_session_dates(apps, schema_editor):
+    MarkStudents = apps.get_model("users", "MarkStudents")
+    AttendanceCounter = apps.get_model("users", "AttendanceCounter")
+    AttendanceSummary = apps.get_model("users", "AttendanceSummary")
+
+    MarkStudents.objects.update(session_date=TruncDate("created_at"))
+
+    # a student could be marked more than once a day before, the first mark
+    # of the day is kept
+    duplicates = (
+        MarkStudents.objects.values("student_id", "unit_id", "session_date")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        marks = MarkStudents.objects.filter(
+            student_id=row["student_id"],
+            unit_id=row["unit_id"],
+            session_date=row["session_date"],
+        ).order_by("created_at", "id")
+        keep = marks.values_list("id", flat=True).first()
+        marks.exclude(id=keep).delete()
+
+    counts = {
+        "present": Count("id", filter=Q(status=True)),
+        "absent": Count("id", filter=Q(status=False)),
+    }
+    marks = MarkStudents.objects.order_by()
+    AttendanceCounter.objects.all().delete()
+    counters = [
+        AttendanceCounter(**row)
+        for row in marks.values("unit_id", "student_id").annotate(**counts)
+    ]
+    counters += [
+        AttendanceCounter(**row)
+        for row in marks.values("unit_id").annotate(**counts)
+    ]
+    AttendanceCounter.objects.bulk_create(counters, batch_size=1000)
+
+    AttendanceSummary.objects.all().delete()
+    AttendanceSummary.objects.bulk_create(
+        [
+            AttendanceSummary(**row)
+            for row in marks.annotate(
+                week=TruncWeek("created_at", output_field=DateField())
+            )
+            .values("unit_id", "student_id", "week")
+            .annotate(**counts)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0010_enrolment_limit"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="markstudents",
+            name="session_date",
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="attendancecounter",
+            name="absent",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_session_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0011_markstudents_session_date"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="markstudents",
+            name="session_date",
+            field=models.DateField(
+                default=django.utils.timezone.localdate, editable=False
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="markstudents",
+            constraint=models.UniqueConstraint(
+                fields=("student", "unit", "session_date"), name="unique_daily_mark"
+            ),
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 4.1.3 on 2026-10-18 17:30
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.utils import timezone
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+def build_sessions(apps, schema_editor):
+    MarkStudents = apps.get_model("users", "MarkStudents")
+    ClassSession = apps.get_model("users", "ClassSession")
+
+    # every day a unit was marked becomes one closed session
+    now = timezone.now()
+    rows = (
+        MarkStudents.objects.values("unit_id", "session_date")
+        .annotate(
+            present=Count("id", filter=Q(status=True)),
+            absent=Count("id", filter=Q(status=False)),
+        )
+        .order_by()
+    )
+    ClassSession.objects.bulk_create(
+        [
+            ClassSession(
+                unit_id=row["unit_id"],
+                date=row["session_date"],
+                closed_at=now,
+                present=row["present"],
+                absent=row["absent"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+    MarkStudents.objects.update(
+        session=Subquery(
+            ClassSession.objects.filter(
+                unit=OuterRef("unit"), date=OuterRef("session_date"), slot=1
+            ).values("pk")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0012_unique_daily_mark"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClassSession",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        max_length=255,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("date", models.DateField(default=django.utils.timezone.localdate)),
+                ("slot", models.PositiveSmallIntegerField(default=1)),
+                ("closed_at", models.DateTimeField(blank=True, null=True)),
+                ("present", models.PositiveIntegerField(default=0)),
+                ("absent", models.PositiveIntegerField(default=0)),
+                (
+                    "unit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="users.units"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date", "slot"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="classsession",
+            constraint=models.UniqueConstraint(
+                fields=("unit", "date", "slot"), name="unique_class_session"
+            ),
+        ),
+        migrations.AddField(
+            model_name="markstudents",
+            name="session",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="users.classsession",
+            ),
+        ),
+        migrations.RunPython(build_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.1.3 on 2026-10-18 17:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0013_classsession"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="markstudents",
+            name="unique_daily_mark",
+        ),
+        migrations.RemoveField(
+            model_name="markstudents",
+            name="session_date",
+        ),
+        migrations.AlterField(
+            model_name="markstudents",
+            name="session",
+            field=models.ForeignKey(
+                blank=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="users.classsession",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="markstudents",
+            constraint=models.UniqueConstraint(
+                fields=("student", "session"), name="unique_session_mark"
+            ),
+        ),
+    ]
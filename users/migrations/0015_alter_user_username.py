@@ -0,0 +1,51 @@
+# Generated by Django 4.1.3 on 2026-10-18 19:05
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rename_duplicate_usernames(apps, schema_editor):
+    """
+    Every account but the first of a shared username gets a number appended,
+    accounts sign in with their email so no login changes
+    """
+    User = apps.get_model("users", "User")
+
+    duplicates = (
+        User.objects.values("username")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        users = User.objects.filter(username=row["username"]).order_by(
+            "created_at", "id"
+        )
+        base, number = row["username"][:140], 1
+        for user in users[1:]:
+            number += 1
+            while User.objects.filter(username=f"{base}-{number}").exists():
+                number += 1
+            user.username = f"{base}-{number}"
+            user.save(update_fields=["username"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0014_markstudents_session"),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_usernames, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="user",
+            name="username",
+            field=models.CharField(
+                help_text="Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.",
+                max_length=150,
+                unique=True,
+                verbose_name="username",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-18 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0015_alter_user_username"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="registeredstudents",
+            index=models.Index(fields=["created_at"], name="student_ordering_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="units",
+            index=models.Index(fields=["created_at", "code"], name="unit_ordering_idx"),
+        ),
+    ]
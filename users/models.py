@@ -1,4 +1,19 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    DateField,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, TruncWeek
+from django.utils import timezone
+from datetime import datetime, timedelta
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -6,9 +21,13 @@ from django.contrib.auth.models import (
 )
 import math
 from django.utils.translation import gettext_lazy as _
-from users.abstracts import TimeStampedModel, UniversalIdModel
-from django.db.models.signals import pre_save
+from users.abstracts import TimeOrderedIdModel, TimeStampedModel, UniversalIdModel
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
+from users.roster import forget_rosters
+from users.revocation import forget_user, revoke_user
+from users.tokens import remember_blacklisted
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 
 
 class UserManager(BaseUserManager):
@@ -58,6 +77,7 @@ class User(AbstractBaseUser, PermissionsMixin, TimeStampedModel, UniversalIdMode
         help_text=_(
             "Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only."
         ),
+        unique=True,
     )
     email = models.EmailField(
         unique=True,
@@ -86,6 +106,16 @@ class User(AbstractBaseUser, PermissionsMixin, TimeStampedModel, UniversalIdMode
     USERNAME_FIELD = "email"
 
 
+@receiver(post_save, sender=User)
+def user_post_save(sender, instance, **kwargs):
+    forget_user(instance.id)
+
+
+@receiver(post_delete, sender=User)
+def user_post_delete(sender, instance, **kwargs):
+    revoke_user(instance.id)
+
+
 class Profile(UniversalIdModel, TimeStampedModel):
     """
     User profile model
@@ -100,6 +130,68 @@ class Profile(UniversalIdModel, TimeStampedModel):
     )
 
 
+def percentage(present: int, sessions: int) -> float:
+    """
+    Share of the sessions held that were attended
+    """
+    if not sessions:
+        return 0
+    return round(present * 100 / sessions, 2)
+
+
+class UnitsManager(models.Manager):
+    def roster(self, lecturer_id) -> list:
+        """
+        Units of the lecturer with their students and attendance
+        """
+        units = {
+            unit["id"]: dict(unit, students=[])
+            for unit in self.filter(lecturer_id=lecturer_id)
+            .values("id", "code", "name")
+            .order_by("code")
+        }
+        sessions = dict(
+            ClassSession.objects.filter(unit__in=list(units))
+            .values_list("unit_id")
+            .annotate(held=Count("id"))
+            .order_by()
+        )
+        for unit_id, unit in units.items():
+            unit["sessions"] = sessions.get(unit_id, 0)
+        attendance = {
+            (row["unit_id"], row["student_id"]): row
+            for row in AttendanceSummary.objects.filter(unit__in=list(units))
+            .values("unit_id", "student_id")
+            # marked first, once annotated present no longer names the field
+            .annotate(marked=Sum("present") + Sum("absent"), present=Sum("present"))
+            .order_by()
+        }
+        registrations = (
+            RegisterUnits.objects.filter(unit__in=list(units))
+            .values(
+                "unit_id",
+                "student_id",
+                regnumber=F("student__regnumber"),
+                sname=F("student__sname"),
+            )
+            .order_by("regnumber")
+        )
+        for row in registrations:
+            counts = attendance.get((row["unit_id"], row["student_id"]), {})
+            present, marked = counts.get("present", 0), counts.get("marked", 0)
+            unit = units[row["unit_id"]]
+            unit["students"].append(
+                {
+                    "regnumber": row["regnumber"],
+                    "sname": row["sname"],
+                    "present": present,
+                    "total": marked,
+                    "percentage": percentage(present, unit["sessions"]),
+                }
+            )
+        return list(units.values())
+
+
 class Units(UniversalIdModel, TimeStampedModel):
     """
     Model for units
@@ -107,14 +199,21 @@ class Units(UniversalIdModel, TimeStampedModel):
 
     code = models.CharField(
         max_length=20,
+        unique=True,
     )
     name = models.CharField(
         max_length=400,
     )
     lecturer = models.ForeignKey(User, on_delete=models.CASCADE, blank=True, null=True)
 
+    objects = UnitsManager()
+
     class Meta:
         ordering = ["created_at", "code"]
+        indexes = [
+            models.Index(fields=["lecturer", "created_at"], name="unit_lecturer_idx"),
+            models.Index(fields=["created_at", "code"], name="unit_ordering_idx"),
+        ]
 
 
 class RegisteredStudents(UniversalIdModel, TimeStampedModel):
@@ -124,13 +223,62 @@ class RegisteredStudents(UniversalIdModel, TimeStampedModel):
 
     regnumber = models.CharField(
         max_length=30,
+        unique=True,
     )
     sname = models.CharField(
         max_length=200,
     )
+    units_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["created_at"], name="student_ordering_idx"),
+        ]
+
+
+class EnrolmentLimitReached(IntegrityError):
+    """
+    The student already holds the most units allowed
+    """
+
+
+class RegisterUnitsManager(models.Manager):
+    max_units = 5
+
+    def take_slot(self, student_id) -> bool:
+        """
+        Counts one more unit for the student unless the limit is reached, the
+        check and the increment are one conditional update
+        """
+        return (
+            RegisteredStudents.objects.filter(
+                pk=student_id, units_count__lt=self.max_units
+            ).update(units_count=F("units_count") + 1)
+            == 1
+        )
+
+    def release_slot(self, student_id):
+        RegisteredStudents.objects.filter(pk=student_id, units_count__gt=0).update(
+            units_count=F("units_count") - 1
+        )
+
+    def refresh_counts(self, student_ids=None) -> int:
+        """
+        Recounts the units of the students, after registrations are written
+        without signals
+        """
+        students = RegisteredStudents.objects.all()
+        if student_ids is not None:
+            students = students.filter(pk__in=student_ids)
+        units = (
+            self.filter(student=OuterRef("pk"))
+            .order_by()
+            .values("student")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return students.update(units_count=Coalesce(Subquery(units), 0))
 
 
 class RegisterUnits(UniversalIdModel, TimeStampedModel):
@@ -141,26 +289,603 @@ class RegisterUnits(UniversalIdModel, TimeStampedModel):
     unit = models.ForeignKey(Units, on_delete=models.CASCADE)
     student = models.ForeignKey(RegisteredStudents, on_delete=models.CASCADE)
 
+    objects = RegisterUnitsManager()
+
     class Meta:
         ordering = ["created_at", "unit"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "unit"], name="unique_student_unit"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["created_at", "unit"], name="registration_ordering_idx"
+            ),
+            models.Index(fields=["created_at", "id"], name="registration_cursor_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # the slot taken in pre_save is given back if the insert fails
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class SessionClosed(IntegrityError):
+    """
+    Marks can not be added to a closed class session
+    """
+
+
+class ClassSessionManager(models.Manager):
+    def current(self, unit_id):
+        """
+        The open session of the unit today, slot 1 is opened when there is none
+        """
+        today = timezone.localdate()
+        session = (
+            self.filter(unit_id=unit_id, date=today, closed_at__isnull=True)
+            .order_by("-slot")
+            .first()
+        )
+        if session is None:
+            session, _ = self.get_or_create(unit_id=unit_id, date=today, slot=1)
+        return session
+
+    def add(self, session_id, present: int, absent: int):
+        """
+        Counts marks into an open session, the closed check and the count are
+        one conditional update
+        """
+        if not self.filter(pk=session_id, closed_at__isnull=True).update(
+            present=F("present") + present, absent=F("absent") + absent
+        ):
+            raise SessionClosed("Class session is closed")
+
+    def remove(self, session_id, present: int, absent: int):
+        # deleted marks are taken out of closed sessions too
+        self.filter(pk=session_id, present__gte=present, absent__gte=absent).update(
+            present=F("present") - present, absent=F("absent") - absent
+        )
+
+    def recount(self) -> int:
+        """
+        Recomputes the counts of every session from its marks
+        """
+        marks = MarkStudents.objects.filter(session=OuterRef("pk")).order_by()
+
+        def count(status):
+            return Coalesce(
+                Subquery(
+                    marks.filter(status=status)
+                    .values("session")
+                    .annotate(count=Count("id"))
+                    .values("count")
+                ),
+                0,
+            )
+
+        return self.update(present=count(True), absent=count(False))
+
+    def close(self, session_id):
+        """
+        Closes the session and recounts its marks, marks waiting on the row
+        lock fail once it is closed
+        """
+        with transaction.atomic():
+            session = self.select_for_update().get(pk=session_id)
+            if session.closed_at is None:
+                counts = MarkStudents.objects.filter(session=session).aggregate(
+                    present=Count("id", filter=Q(status=True)),
+                    absent=Count("id", filter=Q(status=False)),
+                )
+                session.present = counts["present"]
+                session.absent = counts["absent"]
+                session.closed_at = timezone.now()
+                session.save(
+                    update_fields=["present", "absent", "closed_at", "updated_at"]
+                )
+        return session
+
+
+class ClassSession(UniversalIdModel, TimeStampedModel):
+    """
+    One class of a unit, marks are taken while it is open and the counts
+    are final once it is closed
+    """
 
+    unit = models.ForeignKey(Units, on_delete=models.CASCADE)
+    date = models.DateField(default=timezone.localdate)
+    slot = models.PositiveSmallIntegerField(default=1)
+    closed_at = models.DateTimeField(blank=True, null=True)
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+
+    objects = ClassSessionManager()
 
-class MarkStudents(UniversalIdModel, TimeStampedModel):
+    class Meta:
+        ordering = ["date", "slot"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["unit", "date", "slot"], name="unique_class_session"
+            ),
+        ]
+
+
+class MarkStudents(TimeOrderedIdModel, TimeStampedModel):
     student = models.ForeignKey(RegisteredStudents, on_delete=models.CASCADE)
     unit = models.ForeignKey(Units, on_delete=models.CASCADE)
+    session = models.ForeignKey(ClassSession, on_delete=models.CASCADE, blank=True)
     status = models.BooleanField(default=True)
     total = models.PositiveIntegerField(default=1, blank=True)
 
     class Meta:
         ordering = ["created_at", "student", "status"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "session"], name="unique_session_mark"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["student", "unit", "status"], name="mark_student_unit_idx"
+            ),
+            models.Index(fields=["unit", "created_at"], name="mark_unit_date_idx"),
+            models.Index(
+                fields=["created_at", "student", "status"], name="mark_ordering_idx"
+            ),
+            models.Index(fields=["created_at", "id"], name="mark_cursor_idx"),
+            models.Index(
+                fields=["unit", "student"],
+                condition=models.Q(status=True),
+                name="mark_present_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # the attendance counters are updated by total_pre_save and have to
+        # commit or roll back together with the mark
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class SemesterOver(IntegrityError):
+    """
+    The student already has the most marks of this status for the unit
+    """
+
+
+class AttendanceCounterManager(models.Manager):
+    semester_limit = 14
+
+    def _add(self, unit_id, student_id, present: int, absent: int, limit=None):
+        counters = self.filter(unit_id=unit_id, student_id=student_id)
+        guarded = counters
+        if limit is not None:
+            guarded = counters.filter(
+                present__lte=limit - present, absent__lte=limit - absent
+            )
+        changes = {"present": F("present") + present, "absent": F("absent") + absent}
+        if guarded.update(**changes):
+            return True
+        if limit is not None and counters.exists():
+            return False
+        try:
+            with transaction.atomic():
+                self.create(
+                    unit_id=unit_id,
+                    student_id=student_id,
+                    present=present,
+                    absent=absent,
+                )
+        except IntegrityError:
+            # another mark created the counter first
+            return bool(guarded.update(**changes))
+        return True
+
+    def increment(self, unit_id, student_id, present: int = 1, absent: int = 0):
+        """
+        Add marks to the unit and the student counters and return the
+        student's present total for the unit. Raises SemesterOver when the
+        student has reached the semester limit for the status.
+        The unit row is always updated first so concurrent marks for a unit
+        queue on a single row instead of deadlocking.
+        """
+        self._add(unit_id, None, present, absent)
+        if not self._add(
+            unit_id, student_id, present, absent, limit=self.semester_limit
+        ):
+            raise SemesterOver("Semester is over")
+        return (
+            self.filter(unit_id=unit_id, student_id=student_id)
+            .values_list("present", flat=True)
+            .get()
+        )
+
+    def lock_unit(self, unit_id):
+        """
+        Locks the unit row for the rest of the transaction
+        """
+        self._add(unit_id, None, 0, 0)
+
+    def increment_many(self, unit_id, marks: dict) -> dict:
+        """
+        Bulk version of increment without the semester limit, marks maps
+        student ids to their status. Returns the students' present totals.
+        """
+        attended = {key for key, status in marks.items() if status}
+        self._add(unit_id, None, len(attended), len(marks) - len(attended))
+        counters = self.filter(unit_id=unit_id, student_id__in=marks.keys())
+        totals = dict(
+            counters.select_for_update().values_list("student_id", "present")
+        )
+
+        if totals:
+            present = When(student_id__in=attended, then=Value(1))
+            absent = When(student_id__in=attended, then=Value(0))
+            counters.filter(student_id__in=totals.keys()).update(
+                present=F("present") + Case(present, default=Value(0)),
+                absent=F("absent") + Case(absent, default=Value(1)),
+            )
+        self.bulk_create(
+            [
+                self.model(
+                    unit_id=unit_id,
+                    student_id=key,
+                    present=int(status),
+                    absent=int(not status),
+                )
+                for key, status in marks.items()
+                if key not in totals
+            ]
+        )
+        return {key: totals.get(key, 0) + int(marks[key]) for key in marks}
+
+    def decrement(self, unit_id, student_id, present: int = 1, absent: int = 0):
+        for key in (None, student_id):
+            self.filter(
+                unit_id=unit_id,
+                student_id=key,
+                present__gte=present,
+                absent__gte=absent,
+            ).update(present=F("present") - present, absent=F("absent") - absent)
+
+    def expected(self) -> dict:
+        """
+        Counts the marks from scratch as (present, absent), keyed by
+        (unit_id, student_id)
+        """
+        marks = MarkStudents.objects.order_by()
+        counts = {
+            "present": Count("id", filter=Q(status=True)),
+            "absent": Count("id", filter=Q(status=False)),
+        }
+        expected = {}
+        for row in marks.values("unit_id", "student_id").annotate(**counts):
+            expected[(row["unit_id"], row["student_id"])] = (
+                row["present"],
+                row["absent"],
+            )
+        for row in marks.values("unit_id").annotate(**counts):
+            expected[(row["unit_id"], None)] = (row["present"], row["absent"])
+        return expected
+
+    def rebuild(self) -> int:
+        with transaction.atomic():
+            self.all().delete()
+            counters = self.bulk_create(
+                [
+                    self.model(
+                        unit_id=unit_id,
+                        student_id=student_id,
+                        present=present,
+                        absent=absent,
+                    )
+                    for (unit_id, student_id), (present, absent) in (
+                        self.expected().items()
+                    )
+                ],
+                batch_size=1000,
+            )
+        return len(counters)
+
+    def mismatches(self) -> list:
+        """
+        Lists the counters that disagree with the marks as
+        (unit_id, student_id, expected, actual)
+        """
+        expected = self.expected()
+        actual = {
+            (unit_id, student_id): (present, absent)
+            for unit_id, student_id, present, absent in self.values_list(
+                "unit_id", "student_id", "present", "absent"
+            )
+        }
+        mismatches = []
+        for unit_id, student_id in set(expected) | set(actual):
+            want = expected.get((unit_id, student_id), (0, 0))
+            have = actual.get((unit_id, student_id), (0, 0))
+            if want != have:
+                mismatches.append((unit_id, student_id, want, have))
+        return mismatches
+
+
+class AttendanceCounter(UniversalIdModel, TimeStampedModel):
+    """
+    Running totals of present and absent marks per student and unit.
+    The row without a student holds the total for the whole unit.
+    """
+
+    unit = models.ForeignKey(Units, on_delete=models.CASCADE)
+    student = models.ForeignKey(
+        RegisteredStudents, on_delete=models.CASCADE, blank=True, null=True
+    )
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+
+    objects = AttendanceCounterManager()
+
+    class Meta:
+        ordering = ["unit", "student"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["unit", "student"], name="unique_student_unit_counter"
+            ),
+            models.UniqueConstraint(
+                fields=["unit"],
+                condition=models.Q(student__isnull=True),
+                name="unique_unit_counter",
+            ),
+        ]
+
+
+def week_of(value=None):
+    """
+    The monday of the week of a date or datetime, of today when it is empty
+    """
+    if isinstance(value, datetime):
+        day = timezone.localtime(value).date()
+    else:
+        day = value or timezone.localdate()
+    return day - timedelta(days=day.weekday())
+
+
+class AttendanceSummaryManager(models.Manager):
+    def add(self, unit_id, student_id, week, status: bool, count: int = 1):
+        """
+        Adds count marks to the week's summary, a negative count removes them
+        """
+        field = "present" if status else "absent"
+        summaries = self.filter(unit_id=unit_id, student_id=student_id, week=week)
+        if count < 0:
+            summaries.filter(**{f"{field}__gte": -count}).update(
+                **{field: F(field) + count}
+            )
+            return
+        if summaries.update(**{field: F(field) + count}):
+            return
+        try:
+            with transaction.atomic():
+                self.create(
+                    unit_id=unit_id, student_id=student_id, week=week, **{field: count}
+                )
+        except IntegrityError:
+            summaries.update(**{field: F(field) + count})
+
+    def add_many(self, unit_id, week, marks: dict):
+        """
+        Bulk version of add, marks maps student ids to their status.
+        Expects the unit to be locked by AttendanceCounter.objects.lock_unit
+        """
+        summaries = self.filter(unit_id=unit_id, week=week, student_id__in=marks.keys())
+        existing = set(summaries.values_list("student_id", flat=True))
+        if existing:
+            attended = {key for key in existing if marks[key]}
+            present = [When(student_id=key, then=1) for key in attended]
+            absent = [When(student_id=key, then=1) for key in existing - attended]
+            summaries.update(
+                present=F("present") + Case(*present, default=Value(0)),
+                absent=F("absent") + Case(*absent, default=Value(0)),
+            )
+        self.bulk_create(
+            [
+                self.model(
+                    unit_id=unit_id,
+                    student_id=key,
+                    week=week,
+                    present=int(status),
+                    absent=int(not status),
+                )
+                for key, status in marks.items()
+                if key not in existing
+            ]
+        )
+
+    def rebuild(self, chunk_size: int = 50) -> int:
+        """
+        Recomputes the summaries a few units at a time. Every chunk is read
+        from the marks without locks and swapped in its own short transaction.
+        """
+        lecturers = dict(Units.objects.order_by("pk").values_list("pk", "lecturer_id"))
+        unit_ids = list(lecturers)
+        rebuilt = 0
+        for start in range(0, len(unit_ids), chunk_size):
+            chunk = unit_ids[start:start + chunk_size]
+            rows = (
+                MarkStudents.objects.filter(unit_id__in=chunk)
+                .annotate(week=TruncWeek("session__date", output_field=DateField()))
+                .values("unit_id", "student_id", "week")
+                .annotate(
+                    present=Count("id", filter=Q(status=True)),
+                    absent=Count("id", filter=Q(status=False)),
+                )
+                .order_by()
+            )
+            summaries = [self.model(**row) for row in rows]
+            with transaction.atomic():
+                self.filter(unit_id__in=chunk).delete()
+                self.bulk_create(summaries, batch_size=1000)
+                forget_rosters(lecturers[pk] for pk in chunk)
+            rebuilt += len(summaries)
+        return rebuilt
+
+
+class AttendanceSummary(UniversalIdModel, TimeStampedModel):
+    """
+    Present and absent marks of a student in a unit for one week
+    """
+
+    unit = models.ForeignKey(Units, on_delete=models.CASCADE)
+    student = models.ForeignKey(RegisteredStudents, on_delete=models.CASCADE)
+    week = models.DateField()
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+
+    objects = AttendanceSummaryManager()
+
+    class Meta:
+        ordering = ["unit", "student", "week"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "unit", "week"], name="unique_attendance_summary"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["unit", "week"], name="summary_unit_week_idx"),
+        ]
 
 
 @receiver(pre_save, sender=MarkStudents)
 def total_pre_save(sender, instance, **kwargs):
-    instance.total = MarkStudents.objects.filter(status=True).count()
-    # count_status = MarkStudents.objects.filter(status=True).count()
-    # count_attended = (count_status)/15
-    # instance.total = math.ceil(count_attended * 100)
+    if instance.session_id is None:
+        instance.session = ClassSession.objects.current(instance.unit_id)
+    if not instance._state.adding:
+        previous = (
+            MarkStudents.objects.filter(pk=instance.pk)
+            .values("unit_id", "student_id", "session_id", "status", "session__date")
+            .first()
+        )
+        if previous:
+            present, absent = int(previous["status"]), int(not previous["status"])
+            AttendanceCounter.objects.decrement(
+                previous["unit_id"], previous["student_id"], present, absent
+            )
+            ClassSession.objects.remove(previous["session_id"], present, absent)
+            AttendanceSummary.objects.add(
+                previous["unit_id"],
+                previous["student_id"],
+                week_of(previous["session__date"]),
+                previous["status"],
+                -1,
+            )
+    present, absent = int(instance.status), int(not instance.status)
+    instance.total = AttendanceCounter.objects.increment(
+        instance.unit_id, instance.student_id, present, absent
+    )
+    ClassSession.objects.add(instance.session_id, present, absent)
+    AttendanceSummary.objects.add(
+        instance.unit_id,
+        instance.student_id,
+        week_of(instance.session.date),
+        instance.status,
+    )
+
+
+@receiver(post_delete, sender=MarkStudents)
+def total_post_delete(sender, instance, **kwargs):
+    present, absent = int(instance.status), int(not instance.status)
+    AttendanceCounter.objects.decrement(
+        instance.unit_id, instance.student_id, present, absent
+    )
+    ClassSession.objects.remove(instance.session_id, present, absent)
+    AttendanceSummary.objects.add(
+        instance.unit_id,
+        instance.student_id,
+        week_of(instance.session.date),
+        instance.status,
+        -1,
+    )
+
+
+@receiver(pre_save, sender=RegisterUnits)
+def units_count_pre_save(sender, instance, **kwargs):
+    previous = None
+    if not instance._state.adding:
+        previous = (
+            RegisterUnits.objects.filter(pk=instance.pk)
+            .values_list("student_id", flat=True)
+            .first()
+        )
+    if previous == instance.student_id:
+        return
+    if not RegisterUnits.objects.take_slot(instance.student_id):
+        raise EnrolmentLimitReached("Student has reached maximum units")
+    if previous:
+        RegisterUnits.objects.release_slot(previous)
+
+
+@receiver(post_delete, sender=RegisterUnits)
+def units_count_post_delete(sender, instance, **kwargs):
+    RegisterUnits.objects.release_slot(instance.student_id)
+
+
+def forget_unit_roster(instance):
+    """
+    Drops the roster of the lecturer of the unit of a session, registration
+    or mark
+    """
+    if type(instance).unit.is_cached(instance):
+        lecturer_ids = [instance.unit.lecturer_id]
+    else:
+        lecturer_ids = Units.objects.filter(pk=instance.unit_id).values_list(
+            "lecturer_id", flat=True
+        )
+    forget_rosters(lecturer_ids)
+
+
+@receiver(pre_save, sender=Units)
+def roster_unit_pre_save(sender, instance, **kwargs):
+    lecturer_ids = [instance.lecturer_id]
+    if not instance._state.adding:
+        # a unit handed to another lecturer leaves the old roster too
+        lecturer_ids.extend(
+            Units.objects.filter(pk=instance.pk).values_list("lecturer_id", flat=True)
+        )
+    forget_rosters(lecturer_ids)
+
+
+@receiver(post_delete, sender=Units)
+def roster_unit_post_delete(sender, instance, **kwargs):
+    forget_rosters([instance.lecturer_id])
+
+
+@receiver(post_save, sender=ClassSession)
+@receiver(post_delete, sender=ClassSession)
+@receiver(post_save, sender=RegisterUnits)
+@receiver(post_delete, sender=RegisterUnits)
+@receiver(post_save, sender=MarkStudents)
+@receiver(post_delete, sender=MarkStudents)
+def roster_changed(sender, instance, **kwargs):
+    forget_unit_roster(instance)
+
+
+@receiver(post_save, sender=RegisteredStudents)
+def roster_student_changed(sender, instance, created, **kwargs):
+    if not created:
+        forget_rosters(
+            Units.objects.filter(registerunits__student=instance).values_list(
+                "lecturer_id", flat=True
+            )
+        )
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def blacklisted_token_saved(sender, instance, created, **kwargs):
+    if created:
+        token = instance.token
+        transaction.on_commit(
+            lambda: remember_blacklisted(token.jti, token.expires_at)
+        )
 
 
 # class Approved(UniversalIdModel, TimeStampedModel):
@@ -0,0 +1,35 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    ordering = ("created_at", "id")
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Page numbers unless the client asks for cursors with ?pagination=cursor
+    or sends the cursor of a previous page.
+    Cursor pages seek on the (created_at, id) index, so deep pages of the
+    append only tables are as fast as the first one.
+    """
+
+    cursor_class = CreatedAtCursorPagination
+    mode_query_param = "pagination"
+
+    def use_cursor(self, request) -> bool:
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == "cursor"
+            or self.cursor_class.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor = self.cursor_class() if self.use_cursor(request) else None
+        if self.cursor:
+            return self.cursor.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor:
+            return self.cursor.get_paginated_response(data)
+        return super().get_paginated_response(data)
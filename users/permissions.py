@@ -5,9 +5,24 @@ from rest_framework.views import APIView
 
 class IsUser(permissions.BasePermission):
     def has_object_permission(self, request: Request, view: APIView, obj) -> bool:
-        return bool(obj == request.user)
+        return bool(obj.id == request.user.id)
 
 
 class MeUser(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        return bool(obj.user == request.user)
+        return bool(obj.user_id == request.user.id)
+
+
+class IsUnitLecturer(permissions.BasePermission):
+    """
+    The lecturer of the object's unit, or staff
+    """
+
+    message = "Only the lecturer of the unit can manage its sessions and marks."
+
+    @staticmethod
+    def lectures(user, unit) -> bool:
+        return bool(user.is_staff or unit.lecturer_id == user.id)
+
+    def has_object_permission(self, request, view, obj):
+        return self.lectures(request.user, obj.unit)
@@ -0,0 +1,49 @@
+"""
+Cached state of the users behind access tokens
+
+The token authentication does not load the user, it reads whether the user
+still exists and whether they are staff from a short lived cache. Saving or
+deleting a user updates the cache once the change commits, so a deleted
+user's tokens stop working and a demoted user loses staff access straight
+away. Changes made without saving the model show after at most TIMEOUT
+seconds.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+TIMEOUT = 60
+
+
+def state_key(user_id) -> str:
+    return f"users:state:{user_id}"
+
+
+def user_state(user_id):
+    """
+    The staff status of the user as {"is_staff": ...}, None once the user is
+    gone
+    """
+    key = state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = (
+            get_user_model().objects.filter(pk=user_id).values("is_staff").first()
+            or False
+        )
+        cache.set(key, state, TIMEOUT)
+    return state or None
+
+
+def forget_user(user_id):
+    """
+    Drops the cached state of the user once the current transaction commits
+    """
+    transaction.on_commit(lambda: cache.delete(state_key(user_id)))
+
+
+def revoke_user(user_id):
+    """
+    Marks the user as gone once the current transaction commits
+    """
+    transaction.on_commit(lambda: cache.set(state_key(user_id), False, TIMEOUT))
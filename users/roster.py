@@ -0,0 +1,50 @@
+"""
+Cached class lists of the lecturers
+
+The roster of a lecturer, their units with the enrolled students and their
+attendance, is built in three queries and cached under a version per
+lecturer. Writes to units, registrations and marks bump the version once the
+transaction commits, so a roster built from data read before the write is
+cached under the old version and never served again.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+TIMEOUT = 60 * 60
+
+
+def version_key(lecturer_id) -> str:
+    return f"users:roster:{lecturer_id}:version"
+
+
+def roster_version(lecturer_id) -> int:
+    key = version_key(lecturer_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def roster_key(lecturer_id) -> str:
+    return f"users:roster:{lecturer_id}:{roster_version(lecturer_id)}"
+
+
+def bump_roster_version(lecturer_id):
+    try:
+        cache.incr(version_key(lecturer_id))
+    except ValueError:
+        roster_version(lecturer_id)
+
+
+def forget_rosters(lecturer_ids):
+    """
+    Drops the cached rosters of the lecturers once the current transaction
+    commits
+    """
+    for lecturer_id in {pk for pk in lecturer_ids if pk is not None}:
+        transaction.on_commit(
+            lambda lecturer_id=lecturer_id: bump_roster_version(lecturer_id)
+        )
@@ -1,14 +1,33 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from rest_framework.validators import (
-    UniqueValidator,
-    UniqueForDateValidator,
-)
+from rest_framework.validators import UniqueValidator
+from django.db import IntegrityError, transaction
 from django.utils import timezone
-from users.models import Profile, Units, RegisteredStudents, RegisterUnits, MarkStudents
-from rest_framework_simplejwt.tokens import RefreshToken, TokenError
+from users.models import (
+    Profile,
+    Units,
+    ClassSession,
+    RegisteredStudents,
+    RegisterUnits,
+    MarkStudents,
+    AttendanceCounter,
+    AttendanceSummary,
+    EnrolmentLimitReached,
+    SemesterOver,
+    SessionClosed,
+    percentage,
+    week_of,
+)
+from users.abstracts import violated_constraint
+from users.roster import forget_rosters
+from users import tokens
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer as BaseTokenRefreshSerializer,
+)
+from rest_framework_simplejwt.tokens import TokenError
 
-from django.db.models import Count
+from django.db.models import Count, Q
 from users.validators import (
     validate_password_digit,
     validate_password_lowercase,
@@ -19,6 +38,16 @@ from users.validators import (
 User = get_user_model()
 
 
+def duplicate_user_error(error: IntegrityError) -> dict:
+    """
+    Field errors for the unique user field the IntegrityError reports
+    """
+    field = violated_constraint(error, User)
+    if field not in ("email", "username"):
+        raise error
+    return {field: [f"user with this {field} already exists."]}
+
+
 class UserSerializer(serializers.ModelSerializer):
     """
     Serializer of the user model
@@ -33,12 +62,10 @@ class UserSerializer(serializers.ModelSerializer):
     username = serializers.CharField(
         max_length=20,
         min_length=4,
-        validators=[UniqueValidator(queryset=User.objects.all())],
     )
 
     email = serializers.EmailField(
         required=True,
-        validators=[UniqueValidator(queryset=User.objects.all())],
     )
 
     name = serializers.CharField(
@@ -64,11 +91,18 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ("id", "email", "username", "name", "password")
 
     def create(self, validated_data):
-        user = User.objects.create_user(**validated_data)
-        user.save()
-        Profile.objects.create(user=user)
+        with transaction.atomic():
+            user = User.objects.create_user(**validated_data)
+            Profile.objects.create(user=user)
         return user
 
+    def save(self, **kwargs):
+        # email and username are unique in the database, no lookups first
+        try:
+            return super().save(**kwargs)
+        except IntegrityError as error:
+            raise serializers.ValidationError(duplicate_user_error(error))
+
 
 class ProfileSerializer(serializers.ModelSerializer):
     """
@@ -93,6 +127,22 @@ class ProfileSerializer(serializers.ModelSerializer):
         return instance
 
 
+class TokenObtainSerializer(TokenObtainPairSerializer):
+    """
+    Login tokens carrying the claims the token authentication reads
+    """
+
+    token_class = tokens.RefreshToken
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """
+    Refreshes with the cached blacklist check
+    """
+
+    token_class = tokens.RefreshToken
+
+
 class LogoutSerializer(serializers.Serializer):
     refresh = serializers.CharField()
 
@@ -103,7 +153,7 @@ class LogoutSerializer(serializers.Serializer):
     def save(self, **kwargs):  # type:ignore[no-untyped-def]
 
         try:
-            RefreshToken(self.token).blacklist()
+            tokens.RefreshToken(self.token).blacklist()
 
         except TokenError:
 
@@ -176,23 +226,51 @@ class RegisterUnitsSerializer(serializers.ModelSerializer):
         queryset=RegisteredStudents.objects.all(), slug_field="regnumber"
     )
 
+    max_units = RegisterUnits.objects.max_units
+
     class Meta:
         model = RegisterUnits
         fields = ("id", "unit", "student", "created_at")
         read_only_fields = ("id", "created_at")
 
-    def create(self, validated_data):
-        # instance, _ = RegisterUnits.objects.get_or_create(**validated_data)
-        # return instance
-        name = validated_data.get("unit")
-        student = validated_data.get("student")
-
-        if RegisterUnits.objects.filter(student=student).count() >= 5:
+    def save(self, **kwargs):
+        # the limit and the (student, unit) pair are checked by the database
+        try:
+            return super().save(**kwargs)
+        except EnrolmentLimitReached:
             raise serializers.ValidationError("student has reached maximum units")
-        if RegisterUnits.objects.filter(unit=name).count() > 1:
+        except IntegrityError:
             raise serializers.ValidationError("student can only register one unit once")
 
-        return super().create(validated_data)
+
+class ClassSessionSerializer(serializers.ModelSerializer):
+    """
+    Opens a class session for a unit
+    """
+
+    unit = serializers.SlugRelatedField(queryset=Units.objects.all(), slug_field="code")
+
+    class Meta:
+        model = ClassSession
+        fields = (
+            "id",
+            "unit",
+            "date",
+            "slot",
+            "closed_at",
+            "present",
+            "absent",
+            "created_at",
+        )
+        read_only_fields = ("id", "closed_at", "present", "absent", "created_at")
+
+    def save(self, **kwargs):
+        try:
+            return super().save(**kwargs)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                "Unit already has a session in this slot on that date"
+            )
 
 
 class MarkStudentsSerializer(serializers.ModelSerializer):
@@ -200,6 +278,9 @@ class MarkStudentsSerializer(serializers.ModelSerializer):
         queryset=RegisteredStudents.objects.all(), slug_field="regnumber"
     )
     unit = serializers.SlugRelatedField(queryset=Units.objects.all(), slug_field="code")
+    session = serializers.PrimaryKeyRelatedField(
+        queryset=ClassSession.objects.all(), required=False
+    )
     status = serializers.BooleanField(default=True)
     created_at = serializers.DateTimeField(default=timezone.now, read_only=True)
     # marked_at = serializers.DateTimeField(read_only=True, default=timezone.now())
@@ -211,6 +292,7 @@ class MarkStudentsSerializer(serializers.ModelSerializer):
             "created_at",
             "student",
             "unit",
+            "session",
             "status",
             "total",
         )
@@ -219,44 +301,172 @@ class MarkStudentsSerializer(serializers.ModelSerializer):
             "created_at",
             "total",
         )
-        validators = [
-            UniqueForDateValidator(
-                queryset=MarkStudents.objects.all(),
-                field="unit",
-                date_field="created_at",
-                message="Unit can only be marked once",
+
+    def validate(self, attrs):
+        session = attrs.get("session")
+        if session and session.unit_id != attrs["unit"].id:
+            raise serializers.ValidationError("Session belongs to another unit")
+        return attrs
+
+    def save(self, **kwargs):
+        # the session, semester and once per session rules are checked by
+        # the database, marks without a session go to the unit's open one
+        try:
+            return super().save(**kwargs)
+        except SemesterOver:
+            raise serializers.ValidationError("Semester is over")
+        except SessionClosed:
+            raise serializers.ValidationError("Class session is closed")
+        except IntegrityError as error:
+            if violated_constraint(error, MarkStudents) != "unique_session_mark":
+                raise
+            raise serializers.ValidationError(
+                "Student can only be marked once a session"
+            )
+
+
+class BulkMarkSerializer(serializers.Serializer):
+    student = serializers.CharField(max_length=30)
+    status = serializers.BooleanField(default=True)
+
+
+class MarkStudentsBulkSerializer(serializers.Serializer):
+    """
+    Marks a whole class for a unit in one request
+    Rows that fail the checks are reported in row_errors, the rest are saved
+    """
+
+    unit = serializers.SlugRelatedField(queryset=Units.objects.all(), slug_field="code")
+    session = serializers.PrimaryKeyRelatedField(
+        queryset=ClassSession.objects.all(), required=False
+    )
+    marks = BulkMarkSerializer(many=True, allow_empty=False)
+
+    max_marks = 1000
+
+    def validate_marks(self, value):
+        if len(value) > self.max_marks:
+            raise serializers.ValidationError(
+                f"Ensure there are no more than {self.max_marks} marks"
             )
-        ]
+        return value
+
+    def validate(self, attrs):
+        session = attrs.get("session")
+        if session and session.unit_id != attrs["unit"].id:
+            raise serializers.ValidationError("Session belongs to another unit")
+        return attrs
 
     def create(self, validated_data):
-        student = validated_data.get("student")
-        unit = validated_data.get("unit")
-        status = validated_data.get("status")
-
-        if (
-            MarkStudents.objects.filter(
-                student=student, unit=unit, status=status
-            ).count()
-            >= 14
-        ):
-            raise serializers.ValidationError("Semester is over")
-        return super().create(validated_data)
+        unit = validated_data["unit"]
+        rows = validated_data["marks"]
+        self.row_errors = []
+        session = validated_data.get("session") or ClassSession.objects.current(
+            unit.id
+        )
 
+        with transaction.atomic():
+            # serializes roll calls for the unit so the checks below hold
+            AttendanceCounter.objects.lock_unit(unit.id)
+
+            students = {
+                student.regnumber: student
+                for student in RegisteredStudents.objects.filter(
+                    regnumber__in={row["student"] for row in rows}
+                )
+            }
+            counters = {
+                row["student_id"]: row
+                for row in AttendanceCounter.objects.filter(
+                    unit=unit, student__in=students.values()
+                ).values("student_id", "present", "absent")
+            }
+            marked = set(
+                MarkStudents.objects.filter(
+                    session=session, student__in=students.values()
+                ).values_list("student_id", flat=True)
+            )
 
-class AttendanceSerializer(serializers.ModelSerializer):
-    unit_attendance = serializers.SerializerMethodField()
-    semester_attendance = serializers.SerializerMethodField()
-    # regnumber = serializers.CharField(read_only=True)
+            accepted = {}
+            for index, row in enumerate(rows):
+                student = students.get(row["student"])
+                counts = counters.get(student.id, {}) if student else {}
+                field = "present" if row["status"] else "absent"
+                if student is None:
+                    error = "Student does not exist"
+                elif student.id in accepted:
+                    error = "Student appears more than once"
+                elif student.id in marked:
+                    error = "Student can only be marked once a session"
+                elif counts.get(field, 0) >= AttendanceCounter.objects.semester_limit:
+                    error = "Semester is over"
+                else:
+                    accepted[student.id] = (student, row["status"])
+                    continue
+                self.row_errors.append(
+                    {"index": index, "student": row["student"], "error": error}
+                )
+
+            statuses = {key: status for key, (_, status) in accepted.items()}
+            present = sum(statuses.values())
+            try:
+                ClassSession.objects.add(session.id, present, len(statuses) - present)
+            except SessionClosed:
+                raise serializers.ValidationError("Class session is closed")
+            totals = AttendanceCounter.objects.increment_many(unit.id, statuses)
+            AttendanceSummary.objects.add_many(unit.id, week_of(session.date), statuses)
+            # bulk_create sends no signals
+            forget_rosters([unit.lecturer_id])
+            return MarkStudents.objects.bulk_create(
+                [
+                    MarkStudents(
+                        student=student,
+                        unit=unit,
+                        status=status,
+                        session=session,
+                        total=totals[student.id],
+                    )
+                    for student, status in accepted.values()
+                ]
+            )
 
-    def get_unit_attendance(self, instance):
-        return MarkStudents.objects.filter(unit=instance).count()
 
-    def get_semester_attendance(self, instance):
-        return MarkStudents.objects.filter(student=instance).count()
+class AttendanceCountSerializer(serializers.Serializer):
+    """
+    Percentages are out of the sessions the unit held, passed in the
+    context as held, a mapping of unit codes to session counts
+    """
 
-    class Meta:
-        model = RegisteredStudents
-        fields = ["unit_attendance", "semester_attendance"]
+    present = serializers.IntegerField(read_only=True)
+    total = serializers.IntegerField(read_only=True, source="marked")
+    sessions = serializers.SerializerMethodField()
+    percentage = serializers.SerializerMethodField()
+
+    def get_sessions(self, row):
+        return self.context.get("held", {}).get(row["unit_code"], 0)
+
+    def get_percentage(self, row):
+        return percentage(row["present"], self.get_sessions(row))
+
+
+class AttendanceSerializer(AttendanceCountSerializer):
+    """
+    Attendance of a student in a unit, serializes the grouped rows of
+    AttendanceStatisticsView
+    """
+
+    regnumber = serializers.CharField(read_only=True)
+    sname = serializers.CharField(read_only=True)
+    unit = serializers.CharField(read_only=True, source="unit_code")
+
+
+class UnitAttendanceSerializer(AttendanceCountSerializer):
+    unit = serializers.CharField(read_only=True, source="unit_code")
+    name = serializers.CharField(read_only=True)
+    students = serializers.IntegerField(read_only=True)
+
+    def get_percentage(self, row):
+        return percentage(row["present"], self.get_sessions(row) * row["students"])
 
 
 # class ApprovedSerializer(serializers.ModelSerializer):
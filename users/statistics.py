@@ -0,0 +1,170 @@
+"""
+Attendance queries shared by the statistics and export views
+
+The querysets are built here without touching the database, so the same
+functions serve the DRF views and their async counterparts. Statistics are
+read from the weekly summaries when the dates asked for make whole weeks,
+and from the marks themselves otherwise. Lecturers only see the units they
+lecture, staff see every unit.
+"""
+import csv
+import json
+
+from django.db.models import Count, F, Q, Sum
+from rest_framework.exceptions import ValidationError
+
+from users.filters import (
+    AttendanceFilter,
+    AttendanceSummaryFilter,
+    ClassSessionFilter,
+    SessionAttendanceFilter,
+)
+from users.models import AttendanceSummary, ClassSession, MarkStudents
+
+EXPORT_COLUMNS = {
+    "created_at": "created_at",
+    "regnumber": "student__regnumber",
+    "sname": "student__sname",
+    "unit": "unit__code",
+    "unit_name": "unit__name",
+    "session_date": "session__date",
+    "slot": "session__slot",
+    "status": "status",
+}
+
+
+def lectured_by(queryset, user):
+    """
+    The rows of the units the user lectures, every row for staff, the rule of
+    IsUnitLecturer as a filter
+    """
+    if user.is_staff:
+        return queryset
+    return queryset.filter(unit__lecturer_id=user.id)
+
+
+def attendance_records(params, user):
+    """
+    The summaries, or the marks when start is not a Monday or end is not a
+    Sunday, filtered by the statistics filters
+    """
+    filterset = AttendanceSummaryFilter(
+        params, queryset=AttendanceSummary.objects.all()
+    )
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    start = filterset.form.cleaned_data.get("start")
+    end = filterset.form.cleaned_data.get("end")
+    if (start and start.weekday() != 0) or (end and end.weekday() != 6):
+        filterset = SessionAttendanceFilter(
+            params, queryset=MarkStudents.objects.all()
+        )
+    return lectured_by(filterset.qs, user)
+
+
+def attendance_totals(queryset):
+    if queryset.model is MarkStudents:
+        return queryset.annotate(
+            present=Count("id", filter=Q(status=True)), marked=Count("id")
+        )
+    # marked first, once annotated present no longer names the field
+    return queryset.annotate(
+        marked=Sum("present") + Sum("absent"),
+        present=Sum("present"),
+    )
+
+
+def student_attendance(queryset):
+    """
+    Attendance records grouped per student and unit
+    """
+    return attendance_totals(
+        queryset.values(
+            regnumber=F("student__regnumber"),
+            sname=F("student__sname"),
+            unit_code=F("unit__code"),
+        ).order_by("unit_code", "regnumber")
+    )
+
+
+def unit_attendance(queryset):
+    """
+    Attendance records grouped per unit
+    """
+    return attendance_totals(
+        queryset.values(unit_code=F("unit__code"), name=F("unit__name"))
+        .annotate(students=Count("student", distinct=True))
+        .order_by("unit_code")
+    )
+
+
+def sessions_held(params, user):
+    """
+    (unit code, sessions) pairs for the same filters as the statistics
+    """
+    sessions = lectured_by(
+        ClassSessionFilter(params, queryset=ClassSession.objects.all()).qs, user
+    )
+    return sessions.values_list("unit__code").annotate(held=Count("id")).order_by()
+
+
+def export_rows(params, user):
+    filterset = AttendanceFilter(params, queryset=MarkStudents.objects.all())
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    return lectured_by(filterset.qs, user).order_by("created_at", "id")
+
+
+def export_chunk(rows, after=None, size: int = 2000):
+    """
+    The export columns of the next size rows after the (created_at, id) key,
+    and the key to continue from, None once the rows run out
+    """
+    if after is not None:
+        created_at, id = after
+        rows = rows.filter(created_at__gte=created_at).exclude(
+            created_at=created_at, id__lte=id
+        )
+    chunk = list(rows.values_list("id", *EXPORT_COLUMNS.values())[:size])
+    if len(chunk) < size:
+        after = None
+    else:
+        after = (chunk[-1][1], chunk[-1][0])
+    return [row[1:] for row in chunk], after
+
+
+def export_chunks(rows, size: int = 2000):
+    """
+    The export columns of all the rows, read by key one chunk per query so
+    no server side cursor is needed, PgBouncer turns them off
+    """
+    after = None
+    while True:
+        chunk, after = export_chunk(rows, after, size)
+        yield from chunk
+        if after is None:
+            return
+
+
+class Echo:
+    """
+    Hands back whatever csv.writer writes so rows can be streamed
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_lines(rows, output: str = "csv", header: bool = True):
+    """
+    The rows as CSV lines with a header, or as NDJSON lines
+    """
+    if output == "ndjson":
+        for row in rows:
+            yield json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n"
+        return
+    writer = csv.writer(Echo())
+    if header:
+        yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,55 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from users.benchmark import benchmark_user, fixture_units, random_password
+from users.models import AttendanceCounter, MarkStudents, RegisterUnits, Units
+
+User = get_user_model()
+
+
+class BenchmarkSafetyTests(TestCase):
+    @override_settings(DEBUG=False)
+    def test_refuses_without_debug(self):
+        for command in ("seed_benchmark_data", "benchmark_api"):
+            with self.assertRaises(CommandError):
+                call_command(command, stdout=StringIO())
+        self.assertFalse(User.objects.exists())
+
+    @override_settings(DEBUG=False)
+    def test_disposable_flag(self):
+        call_command(
+            "seed_benchmark_data",
+            "--scale",
+            "100",
+            "--i-know-this-is-disposable",
+            stdout=StringIO(),
+        )
+        self.assertTrue(MarkStudents.objects.exists())
+
+    def test_benchmark_user_keeps_to_its_own_units(self):
+        lecturer = User.objects.create_user(
+            "lecturer", "lecturer@example.com", "Pass1!word", name="Lecturer"
+        )
+        unit = Units.objects.create(code="REAL101", name="Real", lecturer=lecturer)
+
+        password = random_password()
+        user = benchmark_user(password)
+        self.assertTrue(user.check_password(password))
+        unit.refresh_from_db()
+        self.assertEqual(unit.lecturer, lecturer)
+        units = fixture_units(user)
+        self.assertEqual(units.count(), 5)
+        self.assertEqual(RegisterUnits.objects.filter(unit__in=units).count(), 100)
+        self.assertEqual(AttendanceCounter.objects.mismatches(), [])
+
+        # a later run reuses the fixture with a new password
+        second = random_password()
+        self.assertEqual(benchmark_user(second), user)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password(second))
+        self.assertFalse(user.check_password(password))
+        self.assertEqual(fixture_units(user).count(), 5)
@@ -0,0 +1,182 @@
+from collections import Counter
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from users.models import (
+    AttendanceCounter,
+    ClassSession,
+    MarkStudents,
+    RegisteredStudents,
+    Units,
+)
+
+User = get_user_model()
+
+
+class AttendanceCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        lecturer = User.objects.create_user(
+            "lecturer", "lecturer@example.com", "Pass1!word", name="Lecturer"
+        )
+        cls.units = [
+            Units.objects.create(code=f"CNT10{n}", name="Unit", lecturer=lecturer)
+            for n in range(2)
+        ]
+        cls.students = [
+            RegisteredStudents.objects.create(regnumber=f"REG{n}", sname="Student")
+            for n in range(2)
+        ]
+        cls.sessions = {
+            (unit.id, slot): ClassSession.objects.create(unit=unit, slot=slot)
+            for unit in cls.units
+            for slot in range(1, 4)
+        }
+
+    def counters(self) -> dict:
+        return {
+            (unit_id, student_id): (present, absent)
+            for unit_id, student_id, present, absent in (
+                AttendanceCounter.objects.values_list(
+                    "unit_id", "student_id", "present", "absent"
+                )
+            )
+            if present or absent
+        }
+
+    def recount(self) -> dict:
+        """
+        The counters counted one mark at a time
+        """
+        counts = Counter()
+        for mark in MarkStudents.objects.all():
+            status = (int(mark.status), int(not mark.status))
+            for key in ((mark.unit_id, mark.student_id), (mark.unit_id, None)):
+                present, absent = counts.get(key, (0, 0))
+                counts[key] = (present + status[0], absent + status[1])
+        return dict(counts)
+
+    def mark(self, unit=0, student=0, slot=1, status=True):
+        unit = self.units[unit]
+        return MarkStudents.objects.create(
+            unit=unit,
+            student=self.students[student],
+            session=self.sessions[(unit.id, slot)],
+            status=status,
+        )
+
+    def assertCountersMatch(self):
+        self.assertEqual(self.counters(), self.recount())
+        self.assertEqual(AttendanceCounter.objects.mismatches(), [])
+
+    def test_increment(self):
+        unit, student = self.units[0].id, self.students[0].id
+        self.assertEqual(AttendanceCounter.objects.increment(unit, student), 1)
+        self.assertEqual(AttendanceCounter.objects.increment(unit, student), 2)
+        self.assertEqual(
+            AttendanceCounter.objects.increment(unit, student, present=0, absent=1), 2
+        )
+        self.assertEqual(
+            self.counters(), {(unit, student): (2, 1), (unit, None): (2, 1)}
+        )
+
+    def test_increment_many(self):
+        unit = self.units[0].id
+        first, second = (student.id for student in self.students)
+        AttendanceCounter.objects.increment(unit, first)
+        totals = AttendanceCounter.objects.increment_many(
+            unit, {first: True, second: False}
+        )
+        self.assertEqual(totals, {first: 2, second: 0})
+        self.assertEqual(
+            self.counters(),
+            {(unit, first): (2, 0), (unit, second): (0, 1), (unit, None): (2, 1)},
+        )
+
+    def test_decrement(self):
+        unit, student = self.units[0].id, self.students[0].id
+        AttendanceCounter.objects.increment(unit, student)
+        AttendanceCounter.objects.decrement(unit, student)
+        # counters never go below zero
+        AttendanceCounter.objects.decrement(unit, student)
+        self.assertEqual(self.counters(), {})
+
+    def test_marking(self):
+        self.assertEqual(self.mark(slot=1).total, 1)
+        self.assertEqual(self.mark(slot=2, status=False).total, 1)
+        self.assertEqual(self.mark(slot=3).total, 2)
+        self.mark(student=1)
+        self.mark(unit=1)
+        self.assertCountersMatch()
+
+    def test_delete(self):
+        marks = [self.mark(slot=slot) for slot in range(1, 4)]
+        self.mark(student=1, status=False)
+        marks[0].delete()
+        self.assertCountersMatch()
+        self.assertEqual(self.mark(slot=1).total, 3)
+
+    def test_repoint(self):
+        mark = self.mark()
+        self.mark(student=1)
+
+        mark.status = False
+        mark.save()
+        self.assertCountersMatch()
+
+        mark.student = self.students[1]
+        mark.session = self.sessions[(self.units[0].id, 2)]
+        mark.save()
+        self.assertCountersMatch()
+
+        mark.unit = self.units[1]
+        mark.session = self.sessions[(self.units[1].id, 1)]
+        mark.save()
+        self.assertCountersMatch()
+        self.assertEqual(
+            self.counters().get((self.units[0].id, self.students[0].id)), None
+        )
+
+    def test_rebuild_and_mismatches(self):
+        for slot in range(1, 4):
+            self.mark(slot=slot, status=slot != 2)
+            self.mark(unit=1, student=1, slot=slot)
+        expected = self.recount()
+
+        unit, student = self.units[0].id, self.students[0].id
+        AttendanceCounter.objects.filter(unit_id=unit, student_id=student).update(
+            present=9
+        )
+        AttendanceCounter.objects.filter(unit=self.units[1], student=None).delete()
+        self.assertEqual(
+            sorted(AttendanceCounter.objects.mismatches(), key=str),
+            sorted(
+                [
+                    (unit, student, expected[(unit, student)], (9, 1)),
+                    (
+                        self.units[1].id,
+                        None,
+                        expected[(self.units[1].id, None)],
+                        (0, 0),
+                    ),
+                ],
+                key=str,
+            ),
+        )
+        with self.assertRaises(CommandError):
+            call_command(
+                "rebuild_attendance_counters",
+                "--check",
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+        call_command("rebuild_attendance_counters", stdout=StringIO())
+        self.assertEqual(self.counters(), expected)
+        self.assertEqual(AttendanceCounter.objects.mismatches(), [])
+        self.assertEqual(AttendanceCounter.objects.rebuild(), len(expected))
+        self.assertEqual(self.counters(), expected)
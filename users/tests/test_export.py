@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from users.models import (
+    ClassSession,
+    MarkStudents,
+    RegisteredStudents,
+    RegisterUnits,
+    Units,
+)
+from users.tokens import RefreshToken
+
+User = get_user_model()
+
+
+@mock.patch("users.async_views.EXPORT_CHUNK_SIZE", 2)
+@mock.patch("users.views.AttendanceExportView.chunk_size", 2)
+class AttendanceExportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer = User.objects.create_user(
+            "lecturer", "lecturer@example.com", "Pass1!word", name="Lecturer"
+        )
+        unit = Units.objects.create(code="EXP101", name="Export", lecturer=cls.lecturer)
+        session = ClassSession.objects.create(unit=unit)
+        for number in range(5):
+            student = RegisteredStudents.objects.create(
+                regnumber=f"S/{number}", sname="Student"
+            )
+            RegisterUnits.objects.create(unit=unit, student=student)
+            MarkStudents.objects.create(unit=unit, student=student, session=session)
+        # rows sharing created_at must not be skipped between chunks
+        first = MarkStudents.objects.order_by("created_at").first().created_at
+        MarkStudents.objects.update(created_at=first)
+        cls.token = str(RefreshToken.for_user(cls.lecturer).access_token)
+
+    def test_export(self):
+        self.client.force_authenticate(self.lecturer)
+        response = self.client.get(reverse("attendance-export"))
+        # one query per chunk of two, no cursor held across them
+        with self.assertNumQueries(3):
+            lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(len(set(lines)), 6)
+
+    async def test_async_export_streams_the_same_rows(self):
+        response = await self.async_client.get(
+            reverse("attendance-export-async"),
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b"".join([part async for part in response.streaming_content])
+        lines = content.decode().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(len(set(lines)), 6)
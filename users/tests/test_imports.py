@@ -0,0 +1,141 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework import serializers
+
+from users.imports import (
+    HASH_CHUNK_SIZE,
+    bulk_insert,
+    import_registrations,
+    import_students,
+    import_users,
+    insert_registrations,
+)
+from users.models import RegisteredStudents, RegisterUnits, Units
+
+User = get_user_model()
+
+
+class ImportStudentsTests(TestCase):
+    def test_import(self):
+        result = import_students(
+            [
+                {"regnumber": "S/1", "sname": "One"},
+                {"regnumber": "S/1", "sname": "Again"},
+                {"regnumber": "S/2", "sname": "Two"},
+            ]
+        )
+        self.assertEqual(result["created"], 2)
+        self.assertEqual([error["index"] for error in result["errors"]], [1])
+
+    def test_rows_written_meanwhile_are_reported(self):
+        # passed the existence check, then another request inserted S/1
+        RegisteredStudents.objects.create(regnumber="S/1", sname="Meanwhile")
+        errors = []
+        created = bulk_insert(
+            RegisteredStudents,
+            {
+                0: RegisteredStudents(regnumber="S/1", sname="One"),
+                1: RegisteredStudents(regnumber="S/2", sname="Two"),
+            },
+            errors,
+            {"regnumber": ["exists"]},
+        )
+        self.assertEqual(created, 1)
+        self.assertEqual(errors, [{"index": 0, "errors": {"regnumber": ["exists"]}}])
+        self.assertEqual(RegisteredStudents.objects.count(), 2)
+
+
+class ImportRegistrationsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        lecturer = User.objects.create_user(
+            "lecturer", "lecturer@example.com", "Pass1!word", name="Lecturer"
+        )
+        cls.units = [
+            Units.objects.create(code=f"U{n}", name=f"Unit {n}", lecturer=lecturer)
+            for n in range(RegisterUnits.objects.max_units + 2)
+        ]
+        cls.student = RegisteredStudents.objects.create(regnumber="S/1", sname="One")
+
+    def test_unit_limit(self):
+        rows = [{"student": "S/1", "unit": unit.code} for unit in self.units]
+        result = import_registrations(rows)
+        self.assertEqual(result["created"], RegisterUnits.objects.max_units)
+        self.assertEqual(len(result["errors"]), 2)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.units_count, RegisterUnits.objects.max_units)
+
+    def test_unit_limit_is_checked_again_under_the_lock(self):
+        # registrations checked before others were written
+        registrations = {
+            index: RegisterUnits(student=self.student, unit=unit)
+            for index, unit in enumerate(self.units[:3])
+        }
+        for unit in self.units[3:]:
+            RegisterUnits.objects.create(student=self.student, unit=unit)
+        errors = []
+        created = insert_registrations(registrations, errors)
+        self.assertEqual(created, 1)
+        self.assertEqual([error["index"] for error in errors], [1, 2])
+        self.assertEqual(
+            RegisterUnits.objects.filter(student=self.student).count(),
+            RegisterUnits.objects.max_units,
+        )
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.units_count, RegisterUnits.objects.max_units)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ImportUsersTests(TestCase):
+    rows = [
+        {
+            "username": f"user{number}",
+            "email": f"user{number}@example.com",
+            "name": "User",
+            "password": "Pass1!word",
+        }
+        for number in range(HASH_CHUNK_SIZE + 1)
+    ]
+
+    @mock.patch("users.imports.ProcessPoolExecutor")
+    def test_hashes_in_process_by_default(self, pool):
+        result = import_users(self.rows)
+        self.assertEqual(result["created"], len(self.rows))
+        pool.assert_not_called()
+        self.assertTrue(User.objects.get(username="user0").check_password("Pass1!word"))
+
+    def test_duplicates(self):
+        User.objects.create_user(
+            "taken", "taken@example.com", "Pass1!word", name="Taken"
+        )
+        rows = [
+            dict(self.rows[0], email="taken@example.com"),
+            dict(self.rows[1], username="taken"),
+            self.rows[2],
+            dict(self.rows[3], email=self.rows[2]["email"]),
+        ]
+        result = import_users(rows)
+        self.assertEqual(result["created"], 1)
+        email = {"email": ["user with this email already exists."]}
+        username = {"username": ["user with this username already exists."]}
+        self.assertEqual(
+            result["errors"],
+            [
+                {"index": 0, "errors": email},
+                {"index": 1, "errors": username},
+                {"index": 3, "errors": email},
+            ],
+        )
+
+    def test_duplicates_created_meanwhile(self):
+        User.objects.create_user(
+            "user1", "taken@example.com", "Pass1!word", name="Taken"
+        )
+        # the accounts show up after the lookups, the insert still fails
+        none = User.objects.none()
+        with mock.patch.object(User.objects, "filter", return_value=none):
+            with self.assertRaises(serializers.ValidationError):
+                import_users(self.rows[:3])
+        self.assertEqual(User.objects.count(), 1)
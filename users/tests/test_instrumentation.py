@@ -0,0 +1,142 @@
+import os
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from attendance.instrumentation import Metrics, QueryRecorder, fingerprint
+from users.models import ClassSession, MarkStudents, RegisteredStudents, Units
+from users.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class QueryRecorderTests(APITestCase):
+    def test_counts_and_fingerprints(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            Units.objects.filter(code="A").exists()
+            Units.objects.filter(code="B").exists()
+            RegisteredStudents.objects.count()
+        self.assertEqual(recorder.count, 3)
+        self.assertGreater(recorder.time, 0)
+        self.assertEqual(sorted(recorder.fingerprints.values()), [1, 2])
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE a = 'x' AND b IN (1, 2, 3)"),
+            "SELECT * FROM t WHERE a = ? AND b IN (...)",
+        )
+
+
+class PrometheusTests(SimpleTestCase):
+    def test_worker_label(self):
+        metrics = Metrics()
+        metrics.record("units-list", 0.02, 0.01, 0.005, 0.005, 3, {"SELECT ?": 2})
+        lines = metrics.prometheus().splitlines()
+        labels = f'view="units-list",worker="{os.getpid()}"'
+        self.assertIn(
+            f'http_request_duration_seconds_bucket{{{labels},le="0.025"}} 1', lines
+        )
+        self.assertIn(f"http_request_queries_count{{{labels}}} 1", lines)
+        self.assertIn(f"http_request_duplicate_queries_total{{{labels}}} 2", lines)
+
+
+@mock.patch("users.async_views.EXPORT_CHUNK_SIZE", 2)
+@mock.patch("users.views.AttendanceExportView.chunk_size", 2)
+class InstrumentationMiddlewareTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer = User.objects.create_user(
+            "lecturer", "lecturer@example.com", "Pass1!word", name="Lecturer"
+        )
+        cls.admin = User.objects.create_user(
+            "admin", "admin@example.com", "Pass1!word", name="Admin", is_staff=True
+        )
+        unit = Units.objects.create(code="MET101", name="Unit", lecturer=cls.lecturer)
+        session = ClassSession.objects.create(unit=unit)
+        for number in range(5):
+            student = RegisteredStudents.objects.create(
+                regnumber=f"S/{number}", sname="Student"
+            )
+            MarkStudents.objects.create(unit=unit, student=student, session=session)
+        cls.token = str(RefreshToken.for_user(cls.lecturer).access_token)
+
+    def setUp(self):
+        patcher = mock.patch("attendance.instrumentation.metrics", Metrics())
+        self.metrics = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_records_the_view(self):
+        self.client.force_authenticate(self.lecturer)
+        self.client.get(reverse("units-list"))
+        endpoint = self.metrics.endpoints["units-list"]
+        self.assertEqual(endpoint.wall.count, 1)
+        self.assertGreater(endpoint.queries.sum, 0)
+        self.assertGreaterEqual(endpoint.wall.sum, endpoint.db.sum)
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_sample_rate(self):
+        self.client.force_authenticate(self.lecturer)
+        self.client.get(reverse("units-list"))
+        self.assertEqual(self.metrics.endpoints, {})
+
+    def test_streaming_body(self):
+        self.client.force_authenticate(self.lecturer)
+        response = self.client.get(reverse("attendance-export"))
+        self.assertNotIn("attendance-export", self.metrics.endpoints)
+        b"".join(response.streaming_content)
+        endpoint = self.metrics.endpoints["attendance-export"]
+        self.assertEqual(endpoint.wall.count, 1)
+        # the three chunk queries run while the body streams
+        self.assertGreaterEqual(endpoint.queries.sum, 3)
+
+    def test_closed_streaming_body(self):
+        self.client.force_authenticate(self.lecturer)
+        response = self.client.get(reverse("attendance-export"))
+        next(iter(response.streaming_content))
+        # request_finished would close the connection of the test database
+        with mock.patch.object(request_finished, "send"):
+            response.close()
+        self.assertEqual(self.metrics.endpoints["attendance-export"].wall.count, 1)
+
+    async def test_async_streaming_body(self):
+        response = await self.async_client.get(
+            reverse("attendance-export-async"),
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+        [part async for part in response.streaming_content]
+        # the chunks are read in sync_to_async threads and are not counted
+        endpoint = self.metrics.endpoints["attendance-export-async"]
+        self.assertEqual(endpoint.wall.count, 1)
+
+    def test_metrics_endpoints_are_for_admins(self):
+        self.client.force_authenticate(self.lecturer)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        response = self.client.get(reverse("metrics-prometheus"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_metrics(self):
+        self.client.force_authenticate(self.admin)
+        self.client.get(reverse("units-list"))
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["worker"], os.getpid())
+        wall = response.data["views"]["units-list"]["wall_seconds"]
+        self.assertEqual(wall["count"], 1)
+
+    def test_prometheus_metrics(self):
+        self.client.force_authenticate(self.admin)
+        self.client.get(reverse("units-list"))
+        response = self.client.get(reverse("metrics-prometheus"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(
+            f'http_request_duration_seconds_count{{view="units-list",'
+            f'worker="{os.getpid()}"}} 1',
+            response.content.decode().splitlines(),
+        )
@@ -0,0 +1,289 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from users.models import (
+    AttendanceCounter,
+    AttendanceSummary,
+    ClassSession,
+    MarkStudents,
+    RegisteredStudents,
+    SemesterOver,
+    Units,
+    week_of,
+)
+
+User = get_user_model()
+
+
+class MarkTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer = User.objects.create_user(
+            "lecturer", "lecturer@example.com", "Pass1!word", name="lecturer"
+        )
+        cls.unit = Units.objects.create(
+            code="MRK101", name="Unit", lecturer=cls.lecturer
+        )
+        cls.student = RegisteredStudents.objects.create(
+            regnumber="REG0", sname="Student"
+        )
+        cls.session = ClassSession.objects.create(unit=cls.unit)
+
+    def setUp(self):
+        self.client.force_authenticate(self.lecturer)
+
+    def mark(self):
+        return self.client.post(
+            reverse("mark-list"),
+            {"student": "REG0", "unit": self.unit.code, "session": self.session.id},
+        )
+
+    def test_once_a_session(self):
+        self.assertEqual(self.mark().status_code, 201)
+        response = self.mark()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, ["Student can only be marked once a session"])
+        self.assertEqual(AttendanceCounter.objects.mismatches(), [])
+
+    def test_semester_over(self):
+        limit = AttendanceCounter.objects.semester_limit
+        for slot in range(2, limit + 2):
+            MarkStudents.objects.create(
+                student=self.student,
+                unit=self.unit,
+                session=ClassSession.objects.create(unit=self.unit, slot=slot),
+            )
+        session = ClassSession.objects.create(unit=self.unit, slot=limit + 2)
+        with self.assertRaises(SemesterOver):
+            MarkStudents.objects.create(
+                student=self.student, unit=self.unit, session=session
+            )
+
+        response = self.client.post(
+            reverse("mark-list"),
+            {"student": "REG0", "unit": self.unit.code, "session": session.id},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, ["Semester is over"])
+        self.assertEqual(MarkStudents.objects.count(), limit)
+        self.assertEqual(AttendanceCounter.objects.mismatches(), [])
+        session.refresh_from_db()
+        self.assertEqual((session.present, session.absent), (0, 0))
+
+        # the limit is per status, absent marks can still be taken
+        response = self.client.post(
+            reverse("mark-list"),
+            {
+                "student": "REG0",
+                "unit": self.unit.code,
+                "session": session.id,
+                "status": False,
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_other_integrity_errors(self):
+        with mock.patch.object(
+            MarkStudents, "save", side_effect=IntegrityError("NOT NULL failed")
+        ):
+            with self.assertRaises(IntegrityError):
+                self.mark()
+
+
+class BulkMarkTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer, cls.other, cls.staff = (
+            User.objects.create_user(
+                name, f"{name}@example.com", "Pass1!word", name=name, is_staff=staff
+            )
+            for name, staff in (("lecturer", False), ("other", False), ("staff", True))
+        )
+        cls.unit = Units.objects.create(
+            code="MRK101", name="Unit", lecturer=cls.lecturer
+        )
+        cls.students = [
+            RegisteredStudents.objects.create(regnumber=f"REG{n}", sname=f"Student {n}")
+            for n in range(3)
+        ]
+        cls.session = ClassSession.objects.create(unit=cls.unit)
+
+    def setUp(self):
+        self.client.force_authenticate(self.lecturer)
+
+    def mark(self, marks, session=None):
+        data = {"unit": self.unit.code, "marks": marks}
+        if session is not None:
+            data["session"] = session.id
+        return self.client.post(reverse("mark-bulk"), data, format="json")
+
+    def roll_call(self):
+        return [
+            {"student": "REG0", "status": True},
+            {"student": "REG1", "status": True},
+            {"student": "REG2", "status": False},
+        ]
+
+    def test_other_lecturer(self):
+        self.client.force_authenticate(self.other)
+        response = self.mark(self.roll_call(), self.session)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(MarkStudents.objects.exists())
+
+    def test_other_lecturer_single_mark(self):
+        self.client.force_authenticate(self.other)
+        response = self.client.post(
+            reverse("mark-list"),
+            {"student": "REG0", "unit": self.unit.code, "session": self.session.id},
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(MarkStudents.objects.exists())
+
+    def test_staff(self):
+        self.client.force_authenticate(self.staff)
+        response = self.mark(self.roll_call(), self.session)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["marks"]), 3)
+
+    def test_session_of_another_unit(self):
+        unit = Units.objects.create(code="MRK102", name="Other", lecturer=self.other)
+        session = ClassSession.objects.create(unit=unit)
+        response = self.mark(self.roll_call(), session)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(MarkStudents.objects.exists())
+
+    def test_totals(self):
+        response = self.mark(self.roll_call(), self.session)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["errors"], [])
+
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.present, self.session.absent), (2, 1))
+        counters = {
+            student_id: (present, absent)
+            for student_id, present, absent in AttendanceCounter.objects.filter(
+                unit=self.unit
+            ).values_list("student_id", "present", "absent")
+        }
+        self.assertEqual(
+            counters,
+            {
+                None: (2, 1),
+                self.students[0].id: (1, 0),
+                self.students[1].id: (1, 0),
+                self.students[2].id: (0, 1),
+            },
+        )
+        summaries = {
+            student_id: (present, absent)
+            for student_id, present, absent in AttendanceSummary.objects.filter(
+                unit=self.unit, week=week_of(self.session.date)
+            ).values_list("student_id", "present", "absent")
+        }
+        self.assertEqual(
+            summaries,
+            {
+                self.students[0].id: (1, 0),
+                self.students[1].id: (1, 0),
+                self.students[2].id: (0, 1),
+            },
+        )
+        self.assertEqual(AttendanceCounter.objects.mismatches(), [])
+
+    def test_totals_on_top_of_earlier_marks(self):
+        MarkStudents.objects.create(
+            student=self.students[0], unit=self.unit, session=self.session
+        )
+        session = ClassSession.objects.create(unit=self.unit, slot=2)
+        response = self.mark(self.roll_call(), session)
+        self.assertEqual(response.status_code, 201)
+        totals = {mark["student"]: mark["total"] for mark in response.data["marks"]}
+        self.assertEqual(totals, {"REG0": 2, "REG1": 1, "REG2": 0})
+        self.assertEqual(AttendanceCounter.objects.mismatches(), [])
+        self.assertEqual(
+            AttendanceSummary.objects.get(
+                unit=self.unit, student=self.students[0]
+            ).present,
+            2,
+        )
+
+    def test_row_errors(self):
+        marks = self.roll_call() + [
+            {"student": "MISSING", "status": True},
+            {"student": "REG0", "status": False},
+        ]
+        MarkStudents.objects.create(
+            student=self.students[1], unit=self.unit, session=self.session
+        )
+        response = self.mark(marks, self.session)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {
+                    "index": 1,
+                    "student": "REG1",
+                    "error": "Student can only be marked once a session",
+                },
+                {"index": 3, "student": "MISSING", "error": "Student does not exist"},
+                {
+                    "index": 4,
+                    "student": "REG0",
+                    "error": "Student appears more than once",
+                },
+            ],
+        )
+        self.assertEqual(
+            sorted(mark["student"] for mark in response.data["marks"]),
+            ["REG0", "REG2"],
+        )
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.present, self.session.absent), (2, 1))
+        self.assertEqual(AttendanceCounter.objects.mismatches(), [])
+
+    def test_every_row_rejected(self):
+        response = self.mark([{"student": "MISSING", "status": True}], self.session)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data["errors"]), 1)
+        self.assertFalse(MarkStudents.objects.exists())
+
+    def test_closed_session(self):
+        ClassSession.objects.filter(pk=self.session.pk).update(
+            closed_at=timezone.now()
+        )
+        response = self.mark(self.roll_call(), self.session)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(MarkStudents.objects.exists())
+        self.assertFalse(
+            AttendanceCounter.objects.filter(student__isnull=False).exists()
+        )
+        self.assertFalse(AttendanceSummary.objects.exists())
+
+    def test_semester_limit(self):
+        limit = AttendanceCounter.objects.semester_limit
+        AttendanceCounter.objects.create(
+            unit=self.unit, student=self.students[0], present=limit
+        )
+        response = self.mark(self.roll_call(), self.session)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.data["errors"],
+            [{"index": 0, "student": "REG0", "error": "Semester is over"}],
+        )
+        self.assertEqual(
+            AttendanceCounter.objects.get(
+                unit=self.unit, student=self.students[0]
+            ).present,
+            limit,
+        )
+        # an absent mark is still allowed once the present ones run out
+        response = self.mark(
+            [{"student": "REG0", "status": False}],
+            ClassSession.objects.create(unit=self.unit, slot=2),
+        )
+        self.assertEqual(response.status_code, 201)
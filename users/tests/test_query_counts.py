@@ -0,0 +1,134 @@
+import itertools
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from attendance.testing import QueryCountTestCase
+from users.models import (
+    ClassSession,
+    MarkStudents,
+    Profile,
+    RegisteredStudents,
+    RegisterUnits,
+    Units,
+)
+
+User = get_user_model()
+
+
+class UsersQueryCountTests(QueryCountTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.numbers = itertools.count()
+        cls.lecturer = cls.make_user()
+        cls.unit = Units.objects.create(
+            code="QC101", name="Query counts", lecturer=cls.lecturer
+        )
+        cls.session = ClassSession.objects.create(
+            unit=cls.unit, date=date.today() - timedelta(days=1)
+        )
+
+    @classmethod
+    def make_user(cls):
+        n = next(cls.numbers)
+        user = User.objects.create_user(
+            f"user{n}", f"user{n}@example.com", "Pass1!word", name=f"User {n}"
+        )
+        Profile.objects.create(user=user)
+        return user
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.lecturer)
+
+    def add_unit(self):
+        n = next(self.numbers)
+        return Units.objects.create(
+            code=f"U{n}", name=f"Unit {n}", lecturer=self.lecturer
+        )
+
+    def add_student(self):
+        n = next(self.numbers)
+        return RegisteredStudents.objects.create(regnumber=f"S/{n}", sname=f"S {n}")
+
+    def add_registration(self):
+        return RegisterUnits.objects.create(unit=self.unit, student=self.add_student())
+
+    def add_mark(self):
+        student = self.add_registration().student
+        return MarkStudents.objects.create(
+            unit=self.unit, student=student, session=self.session
+        )
+
+    def add_session(self):
+        return ClassSession.objects.create(
+            unit=self.unit, date=date(2024, 1, 1), slot=next(self.numbers)
+        )
+
+    def test_users(self):
+        self.assertListQueries(reverse("users"), 2, self.make_user)
+
+    def test_profiles(self):
+        self.assertListQueries(reverse("profiles"), 2, self.make_user)
+
+    def test_user_detail(self):
+        self.assertDetailQueries(reverse("me-detail", args=[self.lecturer.id]), 1)
+
+    def test_profile_detail(self):
+        self.assertDetailQueries(reverse("profile", args=[self.lecturer.id]), 1)
+
+    def test_units(self):
+        self.assertListQueries(reverse("units-list"), 2, self.add_unit)
+
+    def test_my_units(self):
+        self.assertListQueries(reverse("my-units"), 2, self.add_unit)
+
+    def test_unit_detail(self):
+        self.assertDetailQueries(reverse("units-detail", args=[self.unit.id]), 1)
+
+    def test_students(self):
+        self.assertListQueries(reverse("student-list"), 2, self.add_student)
+
+    def test_student_detail(self):
+        student = self.add_student()
+        self.assertDetailQueries(reverse("student-detail", args=[student.id]), 1)
+
+    def test_registrations(self):
+        self.assertListQueries(reverse("student-unit"), 2, self.add_registration)
+
+    def test_registration_cursor_pages(self):
+        self.assertListQueries(
+            reverse("student-unit"),
+            1,
+            self.add_registration,
+            {"pagination": "cursor"},
+        )
+
+    def test_lecturer_registrations(self):
+        self.assertListQueries(reverse("unit-student"), 2, self.add_registration)
+
+    def test_registration_detail(self):
+        registration = self.add_registration()
+        self.assertDetailQueries(
+            reverse("studentunit-detail", args=[registration.id]), 1
+        )
+
+    def test_marks(self):
+        self.assertListQueries(reverse("mark-list"), 2, self.add_mark)
+
+    def test_lecturer_marks(self):
+        self.assertListQueries(reverse("marked-detail"), 2, self.add_mark)
+
+    def test_sessions(self):
+        self.assertListQueries(reverse("session-list"), 2, self.add_session)
+
+    def test_attendance_statistics(self):
+        self.assertListQueries(reverse("attendance-list"), 3, self.add_mark)
+
+    def test_roster(self):
+        self.add_mark()
+        self.assertDetailQueries(reverse("my-roster"), 4)
+        for _ in range(self.page_size):
+            self.add_mark()
+        self.assertDetailQueries(reverse("my-roster"), 4)
@@ -0,0 +1,38 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from flights.models import Flight
+from users.benchmark import hot_querysets, seed, sequential_scans
+from users.models import RegisteredStudents, Units
+
+
+@skipUnless(connection.vendor == "postgresql", "Query plans are checked on PostgreSQL")
+class QueryPlanTests(TestCase):
+    """
+    The hot querysets of the API are served from an index
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(5000)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def test_no_sequential_scans(self):
+        # the seeded tables are still small enough for the planner to prefer
+        # reading them whole, with sequential scans priced out a Seq Scan
+        # is left only where no index fits the query
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        unit = Units.objects.first()
+        querysets = hot_querysets(
+            unit.lecturer,
+            unit,
+            RegisteredStudents.objects.first(),
+            Flight.objects.first(),
+        )
+        scans = sequential_scans(querysets)
+        self.assertEqual(scans, {}, "\n\n".join(f"{n}:\n{p}" for n, p in scans.items()))
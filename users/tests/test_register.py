@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class RegisterTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(
+            "taken", "taken@example.com", "Pass1!word", name="Taken"
+        )
+
+    def register(self, username, email):
+        return self.client.post(
+            reverse("register"),
+            {
+                "username": username,
+                "email": email,
+                "name": "New User",
+                "password": "Pass1!word",
+            },
+        )
+
+    def test_register(self):
+        response = self.register("newuser", "new@example.com")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.filter(username="newuser").exists())
+
+    def test_duplicate_email(self):
+        response = self.register("newuser", "taken@example.com")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data, {"email": ["user with this email already exists."]}
+        )
+        self.assertFalse(User.objects.filter(username="newuser").exists())
+
+    def test_duplicate_username(self):
+        response = self.register("taken", "new@example.com")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data, {"username": ["user with this username already exists."]}
+        )
+        self.assertFalse(User.objects.filter(email="new@example.com").exists())
+
+    def test_other_integrity_errors(self):
+        with mock.patch.object(
+            User.objects, "create_user", side_effect=IntegrityError("NOT NULL failed")
+        ):
+            with self.assertRaises(IntegrityError):
+                self.register("newuser", "new@example.com")
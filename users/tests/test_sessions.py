@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from users.models import ClassSession, Units
+
+User = get_user_model()
+
+
+class ClassSessionPermissionTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer, cls.other, cls.staff = (
+            User.objects.create_user(
+                name, f"{name}@example.com", "Pass1!word", name=name, is_staff=staff
+            )
+            for name, staff in (("lecturer", False), ("other", False), ("staff", True))
+        )
+        cls.unit = Units.objects.create(
+            code="SES101", name="Unit", lecturer=cls.lecturer
+        )
+        cls.session = ClassSession.objects.create(unit=cls.unit)
+
+    def open_session(self, user):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            reverse("session-list"), {"unit": self.unit.code, "slot": 2}
+        )
+
+    def close_session(self, user):
+        self.client.force_authenticate(user)
+        return self.client.post(reverse("session-close", args=[self.session.id]))
+
+    def test_lecturer(self):
+        self.assertEqual(self.open_session(self.lecturer).status_code, 201)
+        self.assertEqual(self.close_session(self.lecturer).status_code, 200)
+
+    def test_other_lecturer(self):
+        self.assertEqual(self.open_session(self.other).status_code, 403)
+        self.assertEqual(self.close_session(self.other).status_code, 403)
+        self.session.refresh_from_db()
+        self.assertIsNone(self.session.closed_at)
+
+    def test_staff(self):
+        self.assertEqual(self.open_session(self.staff).status_code, 201)
+        self.assertEqual(self.close_session(self.staff).status_code, 200)
@@ -0,0 +1,95 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from users.models import (
+    ClassSession,
+    MarkStudents,
+    RegisteredStudents,
+    RegisterUnits,
+    Units,
+)
+from users.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class AttendanceStatisticsTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer = lecturer = User.objects.create_user(
+            "lecturer", "lecturer@example.com", "Pass1!word", name="Lecturer"
+        )
+        cls.other = User.objects.create_user(
+            "other", "other@example.com", "Pass1!word", name="Other"
+        )
+        cls.staff = User.objects.create_user(
+            "staff", "staff@example.com", "Pass1!word", name="Staff", is_staff=True
+        )
+        cls.tokens = {
+            user.id: str(RefreshToken.for_user(user).access_token)
+            for user in (cls.lecturer, cls.other)
+        }
+        unit = Units.objects.create(code="STA101", name="Statistics", lecturer=lecturer)
+        student = RegisteredStudents.objects.create(regnumber="S/1", sname="Student")
+        RegisterUnits.objects.create(unit=unit, student=student)
+        # monday, wednesday, thursday and friday of one week
+        for day in (4, 6, 7, 8):
+            session = ClassSession.objects.create(unit=unit, date=date(2024, 3, day))
+            MarkStudents.objects.create(unit=unit, student=student, session=session)
+
+    def setUp(self):
+        self.client.force_authenticate(self.lecturer)
+
+    def statistics(self, start: str, end: str) -> dict:
+        response = self.client.get(
+            reverse("attendance-list"), {"start": start, "end": end}
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data["results"][0]
+
+    def test_whole_weeks(self):
+        row = self.statistics("2024-03-04", "2024-03-10")
+        self.assertEqual((row["present"], row["total"], row["sessions"]), (4, 4, 4))
+
+    def test_days_inside_a_week(self):
+        row = self.statistics("2024-03-06", "2024-03-07")
+        self.assertEqual((row["present"], row["total"], row["sessions"]), (2, 2, 2))
+        self.assertEqual(row["percentage"], 100)
+
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        for name in ("attendance-list", "unit-attendance-list"):
+            self.assertEqual(self.client.get(reverse(name)).status_code, 401)
+
+    def test_lecturers_only_see_their_units(self):
+        self.client.force_authenticate(self.other)
+        for name in ("attendance-list", "unit-attendance-list"):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["count"], 0)
+        response = self.client.get(reverse("attendance-export"))
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+
+    def test_staff_see_every_unit(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse("attendance-list"))
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["regnumber"], "S/1")
+
+    async def test_async_statistics(self):
+        url = reverse("attendance-list-async")
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 401)
+
+        for user, count in ((self.lecturer, 1), (self.other, 0)):
+            token = self.tokens[user.id]
+            response = await self.async_client.get(
+                url, headers={"Authorization": f"Bearer {token}"}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["count"], count)
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from users.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class StaffTokenTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            "admin", "admin@example.com", "Pass1!word", name="Admin", is_staff=True
+        )
+        self.refresh = RefreshToken.for_user(self.admin)
+
+    def token_tables(self, token) -> int:
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return self.client.get(reverse("token-tables")).status_code
+
+    def test_staff_is_not_a_claim(self):
+        self.assertNotIn("is_staff", self.refresh.payload)
+        self.assertNotIn("is_staff", self.refresh.access_token.payload)
+
+    def test_demoted_user_loses_admin_access(self):
+        self.assertEqual(self.token_tables(self.refresh.access_token), 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.is_staff = False
+            self.admin.save()
+
+        self.assertEqual(self.token_tables(self.refresh.access_token), 403)
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": str(self.refresh)}
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.token_tables(response.data["access"]), 403)
+
+    def test_deleted_user_is_rejected(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.delete()
+        self.assertEqual(self.token_tables(self.refresh.access_token), 401)
@@ -0,0 +1,105 @@
+"""
+Refresh tokens of the API
+
+Refreshing and logging out read and write the blacklist tables of
+simplejwt. Whether a token is blacklisted is cached until the token expires,
+so refreshing a token only queries the blacklist the first time it is seen,
+and expired rows are purged in batches to keep the tables small.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+
+def blacklist_key(jti) -> str:
+    return f"jwt:bl:{jti}"
+
+
+def remember_blacklisted(jti, expires_at):
+    timeout = max(int(expires_at.timestamp() - time.time()), 1)
+    cache.set(blacklist_key(jti), True, timeout)
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Refresh token carrying the username of the user, the access tokens made
+    from it copy the claim. The staff status is not a claim, it is read from
+    the cached user state on every request so a demotion is not outlived by
+    the tokens.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["username"] = user.username
+        return token
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        key = blacklist_key(jti)
+        blacklisted = cache.get(key)
+        if blacklisted is None:
+            blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+            timeout = max(int(self.payload["exp"] - time.time()), 1)
+            # add, so a token blacklisted meanwhile is not cached as valid
+            cache.add(key, blacklisted, timeout)
+        if blacklisted:
+            raise TokenError("Token is blacklisted")
+
+
+def purge_expired(batch_size: int = 5000) -> dict:
+    """
+    Deletes the expired blacklisted and outstanding tokens, batch_size rows
+    per statement so no delete holds its locks for long
+    """
+    now = timezone.now()
+    purged = {}
+    for name, model, lookup in (
+        ("blacklisted", BlacklistedToken, "token__expires_at__lt"),
+        ("outstanding", OutstandingToken, "expires_at__lt"),
+    ):
+        purged[name] = 0
+        while True:
+            ids = list(
+                model.objects.filter(**{lookup: now})
+                .order_by()
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            model.objects.filter(pk__in=ids).delete()
+            purged[name] += len(ids)
+    return purged
+
+
+def token_tables() -> dict:
+    """
+    Rows and size on disk of the token tables, the rows are the planner
+    estimate on PostgreSQL
+    """
+    tables = {}
+    for name, model in (
+        ("outstanding", OutstandingToken),
+        ("blacklisted", BlacklistedToken),
+    ):
+        if connection.vendor != "postgresql":
+            tables[name] = {"rows": model.objects.count(), "bytes": None}
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint, pg_total_relation_size(oid) "
+                "FROM pg_class WHERE relname = %s",
+                [model._meta.db_table],
+            )
+            rows, size = cursor.fetchone()
+        tables[name] = {"rows": max(rows, 0), "bytes": size}
+    return tables
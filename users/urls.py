@@ -1,54 +1,78 @@
 from django.urls import path
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
 
+from users.async_views import (
+    attendance_export,
+    attendance_statistics,
+    lecturer_roster,
+    unit_attendance_statistics,
+)
 from users.views import (
     UserRegister,
+    LoginView,
+    RefreshView,
+    TokenTablesView,
     LogoutView,
     ProfileListView,
     UserDetailView,
     ProfileDetailView,
     UserView,
+    UserImportView,
     UnitsListCreateView,
     UnitsDetailView,
     RegisteredStudentsDetailView,
     RegisteredStudentsListCreateView,
+    RegisteredStudentsImportView,
     MarkStudentListCreateView,
+    MarkStudentBulkCreateView,
     MarkStudentListView,
+    ClassSessionListCreateView,
+    ClassSessionCloseView,
     AttendanceStatisticsView,
+    UnitAttendanceStatisticsView,
+    AttendanceExportView,
     # ApprovedDetailView,
     # ApprovedListCreateView,
     # MyUnitsStudentsApproveView,
     # StatisticsView,
     LecturerStudentListView,
+    LecturerRosterView,
     MyUnitsView,
     StudentUnitListCreateView,
     StudentUnitDetailView,
+    StudentUnitImportView,
     # UnitStudent,
     # ApproveUnitStudentView,
     # UnitAndStudentView,
 )
 
 urlpatterns = [
-    path("login/", TokenObtainPairView.as_view(), name="login"),
+    path("login/", LoginView.as_view(), name="login"),
     path("logout/", LogoutView.as_view(), name="logout"),
-    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("token/refresh/", RefreshView.as_view(), name="token_refresh"),
+    path("token/tables/", TokenTablesView.as_view(), name="token-tables"),
     path("register/", UserRegister.as_view(), name="register"),
 
     path("me/<str:id>/", UserDetailView.as_view(), name="me-detail"),
     path("profile/<str:user>/", ProfileDetailView.as_view(), name="profile"),
     path("users/", UserView.as_view(), name="users"),
+    path("users/import/", UserImportView.as_view(), name="users-import"),
     path("profiles/", ProfileListView.as_view(), name="profiles"),
 
     path("unit/", UnitsListCreateView.as_view(), name="units-list"),
     path("units/<str:id>/", UnitsDetailView.as_view(), name="units-detail"),
 
     path("student/", RegisteredStudentsListCreateView.as_view(), name="student-list"),
+    path(
+        "student/import/", RegisteredStudentsImportView.as_view(), name="student-import"
+    ),
     path("students/<str:id>/", RegisteredStudentsDetailView.as_view(), name="student-detail"),
 
     path("registration/", StudentUnitListCreateView.as_view(), name="student-unit"),
+    path(
+        "registration/import/",
+        StudentUnitImportView.as_view(),
+        name="student-unit-import",
+    ),
     path("registration/<str:id>/", StudentUnitDetailView.as_view(), name="studentunit-detail"),
 
 
@@ -58,10 +82,43 @@ urlpatterns = [
     path("myunits/", MyUnitsView.as_view(), name="my-units"),
 
     path("mystudents/", LecturerStudentListView.as_view(), name="unit-student"),
+    path("myroster/", LecturerRosterView.as_view(), name="my-roster"),
     path("marked/", MarkStudentListView.as_view(), name="marked-detail"),
     path("attendance/", AttendanceStatisticsView.as_view(), name="attendance-list"),
+    path(
+        "attendance/units/",
+        UnitAttendanceStatisticsView.as_view(),
+        name="unit-attendance-list",
+    ),
+    path(
+        "attendance/export/", AttendanceExportView.as_view(), name="attendance-export"
+    ),
+    path(
+        "async/attendance/",
+        attendance_statistics,
+        name="attendance-list-async",
+    ),
+    path(
+        "async/attendance/units/",
+        unit_attendance_statistics,
+        name="unit-attendance-list-async",
+    ),
+    path(
+        "async/attendance/export/",
+        attendance_export,
+        name="attendance-export-async",
+    ),
+    path("async/myroster/", lecturer_roster, name="my-roster-async"),
+
+    path("session/", ClassSessionListCreateView.as_view(), name="session-list"),
+    path(
+        "session/<str:id>/close/",
+        ClassSessionCloseView.as_view(),
+        name="session-close",
+    ),
 
     path("mark/", MarkStudentListCreateView.as_view(), name="mark-list"),
+    path("mark/bulk/", MarkStudentBulkCreateView.as_view(), name="mark-bulk"),
 
     # path("myapprove/", MyUnitsStudentsApproveView.as_view(), name="student-approve"),
     # path("stats/", StatisticsView.as_view(), name="stats"),
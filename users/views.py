@@ -1,23 +1,31 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.generics import GenericAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django_filters import rest_framework as filters
 
 from users.serializers import (
     UserSerializer,
+    TokenObtainSerializer,
+    TokenRefreshSerializer,
     LogoutSerializer,
     ProfileSerializer,
     UnitsSerializer,
     MarkStudentsSerializer,
+    MarkStudentsBulkSerializer,
     RegisteredStudentsSerializer,
     RegisterUnitsSerializer,
     AttendanceSerializer,
+    UnitAttendanceSerializer,
+    ClassSessionSerializer,
 )
 from users.models import (
     Profile,
@@ -25,8 +33,28 @@ from users.models import (
     RegisteredStudents,
     MarkStudents,
     RegisterUnits,
+    ClassSession,
+)
+from users.permissions import IsUnitLecturer, IsUser, MeUser
+from users.filters import ClassSessionFilter
+from users.pagination import OptionalCursorPagination
+from users.imports import (
+    read_rows,
+    import_students,
+    import_registrations,
+    import_users,
+)
+from users.roster import TIMEOUT, roster_key
+from users.tokens import RefreshToken, token_tables
+from users.statistics import (
+    attendance_records,
+    export_chunks,
+    export_lines,
+    export_rows,
+    sessions_held,
+    student_attendance,
+    unit_attendance,
 )
-from users.permissions import IsUser, MeUser
 
 User = get_user_model()
 
@@ -44,6 +72,27 @@ class UserRegister(APIView):
         return Response(response, status=status.HTTP_201_CREATED)
 
 
+class LoginView(TokenObtainPairView):
+    serializer_class = TokenObtainSerializer
+
+
+class RefreshView(TokenRefreshView):
+    serializer_class = TokenRefreshSerializer
+
+
+class TokenTablesView(APIView):
+    """
+    Size of the outstanding and blacklisted token tables
+    """
+
+    permission_classes = [
+        IsAdminUser,
+    ]
+
+    def get(self, request: Request) -> Response:
+        return Response(token_tables())
+
+
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserSerializer
     lookup_field = "id"
@@ -54,7 +103,7 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     ]
 
     def delete(self, request, *args, **kwargs):
-        user = self.request.user
+        user = self.get_object()
         user.delete()
         return Response(
             {"message": "User deleted successfully"},
@@ -86,6 +135,27 @@ class LogoutView(GenericAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class UserImportView(APIView):
+    """
+    Creates many accounts from a CSV file or a JSON list of username, email,
+    name, password and is_staff, ?dry_run=true only validates the rows
+    Passwords are hashed in the request thread, large files go through the
+    provision_users command which hashes them in parallel
+    """
+
+    permission_classes = [
+        IsAdminUser,
+    ]
+
+    def post(self, request: Request) -> Response:
+        dry_run = request.query_params.get("dry_run") in ("1", "true")
+        result = import_users(read_rows(request), dry_run=dry_run)
+        return Response(
+            result,
+            status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED,
+        )
+
+
 class ProfileDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [
         IsAuthenticated,
@@ -93,12 +163,12 @@ class ProfileDetailView(generics.RetrieveUpdateDestroyAPIView):
     ]
     serializer_class = ProfileSerializer
     lookup_field = "user"
-    queryset = Profile.objects.all()
+    queryset = Profile.objects.select_related("user")
 
 
 class ProfileListView(generics.ListAPIView):
     serializer_class = ProfileSerializer
-    queryset = Profile.objects.all()
+    queryset = Profile.objects.select_related("user")
     permission_classes = [
         IsAuthenticated,
     ]
@@ -109,7 +179,7 @@ class UnitsListCreateView(generics.ListCreateAPIView):
     permission_classes = [
         IsAuthenticated,
     ]
-    queryset = Units.objects.all()
+    queryset = Units.objects.select_related("lecturer")
 
 
 class UnitsDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -117,7 +187,7 @@ class UnitsDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [
         IsAuthenticated,
     ]
-    queryset = Units.objects.all()
+    queryset = Units.objects.select_related("lecturer")
     lookup_field = "id"
 
 
@@ -129,7 +199,7 @@ class MyUnitsView(generics.ListAPIView):
         View to list all units for currently authenticated user
         """
         user = self.request.user
-        return Units.objects.filter(lecturer=user)
+        return Units.objects.filter(lecturer_id=user.id).select_related("lecturer")
 
 
 class RegisteredStudentsListCreateView(generics.ListCreateAPIView):
@@ -149,9 +219,30 @@ class RegisteredStudentsDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = "id"
 
 
+class RegisteredStudentsImportView(APIView):
+    """
+    Registers many students from a CSV file or a JSON list of
+    regnumber and sname, ?dry_run=true only validates the rows
+    """
+
+    permission_classes = [
+        IsAuthenticated,
+    ]
+    importer = staticmethod(import_students)
+
+    def post(self, request: Request) -> Response:
+        dry_run = request.query_params.get("dry_run") in ("1", "true")
+        result = self.importer(read_rows(request), dry_run=dry_run)
+        return Response(
+            result,
+            status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED,
+        )
+
+
 class StudentUnitListCreateView(generics.ListCreateAPIView):
     serializer_class = RegisterUnitsSerializer
-    queryset = RegisterUnits.objects.all()
+    queryset = RegisterUnits.objects.select_related("unit", "student")
+    pagination_class = OptionalCursorPagination
     permission_classes = [
         IsAuthenticated,
     ]
@@ -159,13 +250,22 @@ class StudentUnitListCreateView(generics.ListCreateAPIView):
 
 class StudentUnitDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = RegisterUnitsSerializer
-    queryset = RegisterUnits.objects.all()
+    queryset = RegisterUnits.objects.select_related("unit", "student")
     permission_classes = [
         IsAuthenticated,
     ]
     lookup_field = "id"
 
 
+class StudentUnitImportView(RegisteredStudentsImportView):
+    """
+    Registers units for many students from a CSV file or a JSON list of
+    student regnumber and unit code, ?dry_run=true only validates the rows
+    """
+
+    importer = staticmethod(import_registrations)
+
+
 class LecturerStudentListView(generics.ListAPIView):
     serializer_class = RegisterUnitsSerializer
     permission_classes = [
@@ -174,33 +274,196 @@ class LecturerStudentListView(generics.ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return RegisterUnits.objects.filter(unit__lecturer=user)
+        return RegisterUnits.objects.filter(unit__lecturer_id=user.id).select_related(
+            "unit", "student"
+        )
+
+
+class LecturerRosterView(APIView):
+    """
+    Units of the logged in lecturer with their students and attendance,
+    served from the cache
+    """
+
+    permission_classes = [
+        IsAuthenticated,
+    ]
+
+    def get(self, request: Request) -> Response:
+        key = roster_key(request.user.id)
+        roster = cache.get(key)
+        if roster is None:
+            roster = Units.objects.roster(request.user.id)
+            cache.set(key, roster, TIMEOUT)
+        return Response(roster)
+
+
+class ClassSessionListCreateView(generics.ListCreateAPIView):
+    """
+    Lists the sessions of the logged in lecturer's units and opens new ones
+    """
+
+    serializer_class = ClassSessionSerializer
+    filterset_class = ClassSessionFilter
+    permission_classes = [
+        IsAuthenticated,
+    ]
+
+    def get_queryset(self):
+        user = self.request.user
+        return ClassSession.objects.filter(unit__lecturer_id=user.id).select_related(
+            "unit"
+        )
+
+    def perform_create(self, serializer):
+        if not IsUnitLecturer.lectures(
+            self.request.user, serializer.validated_data["unit"]
+        ):
+            raise PermissionDenied(IsUnitLecturer.message)
+        serializer.save()
+
+
+class ClassSessionCloseView(GenericAPIView):
+    """
+    Closes a session, its present and absent counts are final afterwards
+    """
+
+    serializer_class = ClassSessionSerializer
+    lookup_field = "id"
+    queryset = ClassSession.objects.select_related("unit")
+    permission_classes = [
+        IsAuthenticated,
+        IsUnitLecturer,
+    ]
+
+    def post(self, request: Request, id: str) -> Response:
+        session = self.get_object()
+        closed = ClassSession.objects.close(session.id)
+        closed.unit = session.unit
+        return Response(self.get_serializer(closed).data)
 
 
 class MarkStudentListCreateView(generics.ListCreateAPIView):
     serializer_class = MarkStudentsSerializer
-    queryset = MarkStudents.objects.all()
+    queryset = MarkStudents.objects.select_related("student", "unit")
+    pagination_class = OptionalCursorPagination
+    permission_classes = [
+        IsAuthenticated,
+    ]
+
+    def perform_create(self, serializer):
+        # the session, when given, belongs to the unit, see validate
+        if not IsUnitLecturer.lectures(
+            self.request.user, serializer.validated_data["unit"]
+        ):
+            raise PermissionDenied(IsUnitLecturer.message)
+        serializer.save()
+
+
+class MarkStudentBulkCreateView(GenericAPIView):
+    """
+    Marks many students for one unit, rows that can not be marked are
+    returned in errors without failing the rest
+    """
+
+    serializer_class = MarkStudentsBulkSerializer
     permission_classes = [
         IsAuthenticated,
     ]
 
+    def post(self, request: Request) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # the session, when given, belongs to the unit, see validate
+        if not IsUnitLecturer.lectures(request.user, serializer.validated_data["unit"]):
+            raise PermissionDenied(IsUnitLecturer.message)
+        marks = serializer.save()
+        return Response(
+            {
+                "marks": MarkStudentsSerializer(marks, many=True).data,
+                "errors": serializer.row_errors,
+            },
+            status=status.HTTP_201_CREATED if marks else status.HTTP_400_BAD_REQUEST,
+        )
+
 
 class MarkStudentListView(generics.ListAPIView):
     serializer_class = MarkStudentsSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = [
         IsAuthenticated,
     ]
-    queryset = MarkStudents.objects.all()
+    queryset = MarkStudents.objects.select_related("student", "unit")
 
     def get_queryset(self):
         user = self.request.user
-        return super().get_queryset().filter(unit__lecturer=user)
+        return super().get_queryset().filter(unit__lecturer_id=user.id)
 
 
 class AttendanceStatisticsView(generics.ListAPIView):
+    """
+    Attendance counts and percentages per student and unit
+    Read from the weekly summaries unless the dates split a week, filtered
+    first and then grouped in a single query
+    """
+
     serializer_class = AttendanceSerializer
-    queryset = MarkStudents.objects.all()
-    # permission_classes = [IsAuthenticated,]
+    permission_classes = [
+        IsAuthenticated,
+    ]
+
+    grouping = staticmethod(student_attendance)
+
+    def get_queryset(self):
+        return attendance_records(self.request.query_params, self.request.user)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["held"] = dict(
+            sessions_held(self.request.query_params, self.request.user)
+        )
+        return context
+
+    def filter_queryset(self, queryset):
+        return self.grouping(queryset)
+
+
+class UnitAttendanceStatisticsView(AttendanceStatisticsView):
+    """
+    Attendance counts and percentages per unit
+    """
+
+    serializer_class = UnitAttendanceSerializer
+    grouping = staticmethod(unit_attendance)
+
+
+class AttendanceExportView(APIView):
+    """
+    Streams the marks as CSV, or as NDJSON with ?output=ndjson
+    Takes the same unit, lecturer, start and end filters as the statistics,
+    rows are read in chunks so memory stays flat whatever the export size
+    """
+
+    permission_classes = [
+        IsAuthenticated,
+    ]
+    chunk_size = 2000
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        rows = export_chunks(
+            export_rows(request.query_params, request.user), self.chunk_size
+        )
+        output = request.query_params.get("output", "csv")
+        if output == "ndjson":
+            content_type, filename = "application/x-ndjson", "attendance.ndjson"
+        else:
+            content_type, filename = "text/csv", "attendance.csv"
+
+        response = StreamingHttpResponse(
+            export_lines(rows, output), content_type=content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
 
 # class ApprovedListCreateView(generics.ListCreateAPIView):